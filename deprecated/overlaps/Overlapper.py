@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+from concurrent.futures import ThreadPoolExecutor
 import itertools as it
 import logging
 import os
@@ -89,7 +90,10 @@ class Overlapper:
 
     def discover_geometries(self, path):
         xyz_fns = natsorted(path.glob("*.xyz"))
-        geoms = [geom_from_xyz_file(xyz_fn) for xyz_fn in xyz_fns]
+        # Reading many small files is dominated by I/O, so they are read by
+        # several threads. map() keeps the order of the files.
+        with ThreadPoolExecutor(max_workers=max(1, min(16, len(xyz_fns)))) as executor:
+            geoms = list(executor.map(geom_from_xyz_file, xyz_fns))
         self.restore_calculators(geoms)
 
         return geoms
@@ -21,7 +21,7 @@ def ipi_client(addr, atoms, forces_getter, hessian_getter=None, hdrlen=12):
     VIRIAL = struct.pack("d" * 9, *np.zeros(9))
     ZERO = struct.pack("i", 0)
 
-    fmts = get_fmts(cartesians)
+    fmts = get_fmts()
 
     # Unix socket is hardcoded right now, but may also be inet-socket
     sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
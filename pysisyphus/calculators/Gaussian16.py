@@ -1,17 +1,70 @@
 from collections import namedtuple
+import contextlib
 import io
+import itertools as it
+import os
 from pathlib import Path
 import re
 import shutil
+import string
 import subprocess
 import textwrap
 
 import numpy as np
-import pyparsing as pp
 
 from pysisyphus.calculators.OverlapCalculator import OverlapCalculator
 from pysisyphus.constants import AU2EV, BOHR2ANG
-from pysisyphus.helpers_pure import file_or_str
+
+# Gaussian prints floats in Fortran notation, e.g., 0.100000D+01
+D2E = str.maketrans("D", "E")
+
+# Route keywords with optional options, e.g., td=(nstates=2,root=1)
+_WORD = r"[A-Za-z0-9\-/]+"
+KEYWORD_RE = re.compile(rf"({_WORD})=?\(?((?:{_WORD}=?(?:{_WORD})?,?)*)")
+OPTION_RE = re.compile(rf"({_WORD})=?({_WORD})?,?")
+
+# Precompiled regular expressions, used when parsing Gaussian output
+EXC_KW_RE = re.compile(r"((?:td|cis|tda).+?(:?\s|$))")
+GS_RE = re.compile(r"SCF Energy\s+R\s+([\d\-\+Ee\.]+)")
+ETRANS_RE = re.compile(
+    r"ETran state values\s+R\s+N=\s+(\d+)([\d\-\.Ee\+\s]+)", re.DOTALL
+)
+INSTAB_RE = re.compile("wavefunction.*instability.*")
+STABLE_RE = re.compile("wavefunction is stable")
+TD_RE = re.compile(r"Excited State\s*\d+:\s*[\.\w\?-]+\s*([\d\.-]+?)\s*eV")
+ROOTS_RE = re.compile(r"Root\s+(\d+)")
+# NBasis=    16 NAE=    12 NBE=    12 NFC=     6 NFV=     0
+BASIS_RE = re.compile("NBasis=(.+)NAE=(.+)NBE=(.+)NFC=(.+)NFV=(.+)")
+ACT_RE = re.compile("NROrb=(.*)NOA=(.*)NOB=(.*)NVA=(.*)NVB=(.*)")
+DUMP_635R_RE = re.compile(r"read left to right\):\s*(.+)", re.DOTALL)
+NBAS_RE = re.compile(r"NBasis =\s*(\d+)")
+
+NMOs = namedtuple(
+    "NMOs",
+    "a_core, a_occ a_act a_vir " "b_core b_occ b_act b_vir " "restricted",
+)
+
+
+def get_block_inds(nbas, cols=5, first_row=0, stop=None):
+    """Row and column indices of a lower triangle matrix, as printed by
+    Gaussian in blocks of 'cols' columns each.
+
+    Only rows >= first_row of the blocks starting before stop are considered."""
+    if stop is None:
+        stop = nbas
+    starts = np.arange(0, stop, cols)
+    first_rows = np.maximum(starts, first_row)
+    nrows = nbas - first_rows
+    # Row and first column of every printed line
+    line_offsets = np.repeat(np.cumsum(nrows) - nrows, nrows)
+    line_rows = np.repeat(first_rows, nrows) + np.arange(nrows.sum()) - line_offsets
+    line_starts = np.repeat(starts, nrows)
+    # Number of entries on every line
+    counts = np.minimum(cols, line_rows - line_starts + 1)
+    offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    rows = np.repeat(line_rows, counts)
+    cols_ = np.repeat(line_starts, counts) + np.arange(counts.sum()) - offsets
+    return rows, cols_
 
 
 class Gaussian16(OverlapCalculator):
@@ -69,7 +122,7 @@ class Gaussian16(OverlapCalculator):
                 k: v for k, v in exc_dict.items() if k not in ("nstates", "root")
             }
             # Delete exc keyword, as we build it later on
-            self.route = re.sub(r"((?:td|cis|tda).+?(:?\s|$))", "", self.route)
+            self.route = EXC_KW_RE.sub("", self.route)
 
         self.to_keep = ("com", "fchk", "log", "dump_635r", "input.xyz")
         if self.keep_chk:
@@ -80,6 +133,10 @@ class Gaussian16(OverlapCalculator):
         self.out_fn = f"{self.fn_base}.log"
         self.chk_fn = f"{self.fn_base}.chk"
         self.dump_base_fn = f"{self.fn_base}_rwfdump"
+        # .chk belonging to self.fchk, together with the (path, mtime) of the
+        # .fchk. It is consumed by the next call of reuse_data.
+        self.guess_chk = self.out_dir / f"{self.name}.guess.chk"
+        self._guess_key = None
 
         self.gaussian_input = """
         %nproc={pal}
@@ -100,6 +157,26 @@ class Gaussian16(OverlapCalculator):
 
         """
         self.gaussian_input = textwrap.dedent(self.gaussian_input)
+        # Split the template once into (literal, field) pairs, so
+        # prepare_input only has to join strings. The basis set fields are
+        # constant and already merged into the literals. pal, mem, charge
+        # and mult may be changed by the caller, so they are filled in on
+        # every call.
+        static_fields = {
+            "gbs": self.make_gbs_str(),
+            "gen": self.gen,
+        }
+        self._input_parts = list()
+        head = ""
+        for literal, field, _, _ in string.Formatter().parse(self.gaussian_input):
+            head += literal
+            if field in static_fields:
+                head += str(static_fields[field])
+            else:
+                self._input_parts.append((head, field))
+                head = ""
+        if head:
+            self._input_parts.append((head, None))
 
         self.parser_funcs = {
             "force": self.parse_force,
@@ -134,10 +211,17 @@ class Gaussian16(OverlapCalculator):
         if (self.fchk is None) and not hasattr(self, "chk"):
             return ""
         new_chk = path / self.chk_fn
-        prev_fchk = new_chk.with_suffix(".fchk")
-        shutil.copy(self.fchk, prev_fchk)
-        cmd = f"{self.unfchk_cmd} {prev_fchk}".split()
-        subprocess.run(cmd, stdout=subprocess.PIPE, cwd=path)
+        fchk_key = (str(self.fchk), os.stat(self.fchk).st_mtime_ns)
+        # Skip copying and converting the .fchk, when a .chk belonging to it
+        # is present. It is moved, so no stale copy is left in out_dir.
+        if (fchk_key == self._guess_key) and self.guess_chk.exists():
+            shutil.move(self.guess_chk, new_chk)
+        else:
+            prev_fchk = new_chk.with_suffix(".fchk")
+            shutil.copyfile(self.fchk, prev_fchk)
+            cmd = f"{self.unfchk_cmd} {prev_fchk}".split()
+            subprocess.run(cmd, stdout=subprocess.DEVNULL, cwd=path)
+        self._guess_key = None
         self.log(f"Using MO guess from '{self.fchk}'.")
 
         reuse_str = "guess=read"
@@ -181,8 +265,6 @@ class Gaussian16(OverlapCalculator):
             "charge": self.charge,
             "mult": self.mult,
             "coords": coords,
-            "gbs": self.make_gbs_str(),
-            "gen": self.gen,
         }
         if calc_type == "double_mol":
             update = {
@@ -211,20 +293,33 @@ class Gaussian16(OverlapCalculator):
                 pc_str = handle.getvalue()
             # Append point charges to coords
             kwargs["coords"] += "\n\n" + pc_str
-        inp = self.gaussian_input.format(**kwargs)
+        inp = "".join(
+            literal + ("" if field is None else str(kwargs[field]))
+            for literal, field in self._input_parts
+        )
         return inp
 
-    def make_fchk(self, path):
+    def make_fchk(self, path, wait=True):
         cmd = f"{self.formchk_cmd} {self.chk_fn}".split()
-        subprocess.run(cmd, stdout=subprocess.PIPE, cwd=path)
-        self.log("Created .fchk")
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, cwd=path)
+        if wait:
+            self.wait_fchk(proc)
+        return proc
+
+    def wait_fchk(self, proc):
+        returncode = proc.wait()
+        if returncode == 0:
+            self.log("Created .fchk")
+        else:
+            self.log(f"formchk failed with return code {returncode}!")
+        return returncode
 
     def run_rwfdump(self, path, rwf_index, chk_path=None):
         if chk_path is None:
             chk_path = path / self.chk_fn
         dump_fn = path / f"{self.dump_base_fn}_dump_{rwf_index}"
         cmd = f"rwfdump {chk_path} {dump_fn} {rwf_index}".split()
-        subprocess.run(cmd)
+        subprocess.run(cmd, stdout=subprocess.DEVNULL)
         self.log(f"Dumped {rwf_index} from .chk.")
         return dump_fn
 
@@ -234,73 +329,89 @@ class Gaussian16(OverlapCalculator):
             self.log("No .chk file found.")
             return
         # Create the .fchk file so we can keep it and parse it later on.
-        self.make_fchk(path)
-        if self.track:
-            self.run_rwfdump(path, "635r")
-            self.nmos, self.roots = self.parse_log(path / self.out_fn)
+        # formchk and rwfdump only read the .chk, so they can run concurrently.
+        fchk_proc = self.make_fchk(path, wait=False)
+        # Always wait for formchk, even when rwfdump or parsing fails.
+        try:
+            if self.track:
+                self.run_rwfdump(path, "635r")
+                self.nmos, self.roots = self.parse_log(path / self.out_fn)
+        finally:
+            self.wait_fchk(fchk_proc)
+
+    def keep(self, path):
+        kept_fns = super().keep(path)
+        # Carry the .chk over as MO guess for the next calculation. It belongs
+        # to the .fchk that was just kept, so reuse_data can skip unfchk. The
+        # temporary directory is deleted afterwards, so the .chk is moved.
+        chk = path / self.chk_fn
+        if chk.exists() and ("fchk" in kept_fns) and (kept_fns["fchk"] == self.fchk):
+            shutil.move(chk, self.guess_chk)
+            self._guess_key = (str(self.fchk), os.stat(self.fchk).st_mtime_ns)
+        return kept_fns
 
     def parse_keyword(self, text):
-        word = pp.Word(pp.alphanums + "-" + "/")
-
-        keyword = word.setResultsName("keyword")
-        equals = pp.Literal("=")
-        option = pp.Group(
-            word
-            + pp.Suppress(pp.Optional(equals))
-            + pp.Optional(word, default="")
-            + pp.Suppress(pp.Optional(","))
-        )
-        options = (
-            pp.Suppress(pp.Optional(equals))
-            + pp.Suppress(pp.Optional("("))
-            + pp.OneOrMore(option)
-            + pp.Suppress(pp.Optional(")"))
-        ).setResultsName("options")
-
-        parser = keyword + pp.Optional(options, default=[])
-
-        result = parser.parseString(text)
-        as_dict = result.asDict()
-        kw = as_dict["keyword"]
-        opt_dict = {key: value for key, value in as_dict["options"]}
+        kw, opt_str = KEYWORD_RE.match(text).groups()
+        opt_dict = {key: value for key, value in OPTION_RE.findall(opt_str)}
         return kw, opt_dict
 
     @staticmethod
     def parse_fchk(fchk_path, keys):
-        with open(fchk_path) as handle:
-            text = handle.read()
+        """Parse the given keys from a formatted checkpoint file.
 
-        def to_float(s, loc, toks):
-            return float(toks[0])
-
-        # Matches -4.10693837E-16 and 1.60184209E-15
-        float_ = pp.Word(pp.nums + "+-E.").setParseAction(to_float)
-        # Start with Empty so we can progessively build the
-        # parser for all keys.
-        parser = pp.Empty()
-
-        def parser_for_key(key):
-            return pp.Group(
-                pp.Suppress(pp.SkipTo(key))
-                + key
-                + pp.restOfLine
-                + pp.ZeroOrMore(float_)
-            )
+        The file is scanned line by line. Scalar entries like
+
+          Total Energy  [...] R     -9.219940072302333E+01
 
-        for key in keys:
-            parser += parser_for_key(key)
-        results = parser.parseString(text)
+        are returned as float, arrays like
+
+          Cartesian Gradient [...] R   N=           9
+          [Matrix entries]
+
+        are returned as 1d float arrays. Arrays are read in chunks of lines
+        into a preallocated array, so the whole file, or a whole array as
+        text, is never kept in memory.
+
+        Besides a path, an open text stream can be given, e.g., the stdout
+        of a subprocess, that is then consumed up to the last requested key."""
+        # Entries per line for real and integer arrays
+        per_line = {"R": 5, "I": 6}
+        chunk_lines = 4096
+        keys_remaining = set(keys)
         results_dict = {}
-        for key, res in zip(keys, results):
-            # This handles scalar entries like
-            # Total Energy  [...] R     -9.219940072302333E+01
-            if len(res) == 2:
-                results_dict[key] = float(res[-1].split()[-1])
-            # This handles matrices like
-            # Cartesian Gradient [...] R   N=           9 \
-            # [Matrix entries]
-            if len(res) > 2:
-                results_dict[key] = np.array(res[2:])
+        if isinstance(fchk_path, (str, Path)):
+            stream = open(fchk_path, buffering=1 << 20)
+        else:
+            stream = contextlib.nullcontext(fchk_path)
+        with stream as handle:
+            for line in handle:
+                if not keys_remaining:
+                    break
+                # Keys start in the first column, array entries are indented.
+                if line.startswith(" "):
+                    continue
+                key = next((k for k in keys_remaining if line.startswith(k)), None)
+                if key is None:
+                    continue
+                keys_remaining.remove(key)
+                kind, *_, num = line[len(key) :].split()
+                # Scalar entry
+                if "N=" not in line:
+                    results_dict[key] = float(num)
+                    continue
+                count = int(num)
+                nlines = -(-count // per_line[kind])
+                arr = np.empty(count)
+                filled = 0
+                for start in range(0, nlines, chunk_lines):
+                    chunk = "".join(it.islice(handle, min(chunk_lines, nlines - start)))
+                    vals = np.fromstring(chunk, sep=" ")
+                    arr[filled : filled + vals.size] = vals
+                    filled += vals.size
+                assert filled == count, f"Expected {count} items for '{key}'!"
+                results_dict[key] = arr
+        if keys_remaining:
+            raise KeyError(f"Could not find {keys_remaining} in '{fchk_path}'!")
         return results_dict
 
     def parse_all_energies(self, fchk=None):
@@ -309,17 +420,9 @@ class Gaussian16(OverlapCalculator):
         with open(fchk) as handle:
             text = handle.read()
 
-        float_ = r"([\d\-\+Ee\.]+)"
-        gs_re = re.compile(r"SCF Energy\s+R\s+" + float_)
-        gs_mobj = gs_re.search(text)
+        gs_mobj = GS_RE.search(text)
         gs_energy = float(gs_mobj[1])
-        # cis_re = re.compile(r"CIS Energy\s+R\s+" + float_)
-        # cis_mobj = cis_re.search(text)
-        # cis_energy = float(cis_mobj[1])
-        etrans_re = re.compile(
-            r"ETran state values\s+R\s+N=\s+(\d+)([\d\-\.Ee\+\s]+)", re.DOTALL
-        )
-        etrans_mobj = etrans_re.search(text)
+        etrans_mobj = ETRANS_RE.search(text)
         try:
             etrans = etrans_mobj[2].strip().split()
             etrans = np.array(etrans, dtype=float).reshape(-1, 16)
@@ -389,12 +492,10 @@ class Gaussian16(OverlapCalculator):
         log_path = path / self.out_fn
         with open(log_path) as handle:
             text = handle.read()
-        instab_re = "wavefunction.*instability.*"
-        instab_mobj = re.search(instab_re, text)
+        instab_mobj = INSTAB_RE.search(text)
         if instab_mobj:
             self.log("Found instability!")
-        stable_re = "wavefunction is stable"
-        mobj = re.search(stable_re, text)
+        mobj = STABLE_RE.search(text)
         is_stable = bool(mobj)
         return is_stable
 
@@ -416,7 +517,7 @@ class Gaussian16(OverlapCalculator):
     def run_double_mol_calculation(self, atoms, coords1, coords2):
         self.log("Running double molecule calculation")
         double_atoms = atoms + atoms
-        double_coords = np.hstack((coords1, coords2))
+        double_coords = np.concatenate((coords1, coords2))
         inp = self.prepare_input(double_atoms, double_coords, "double_mol")
         kwargs = {
             "calc": "double_mol",
@@ -430,50 +531,50 @@ class Gaussian16(OverlapCalculator):
     def parse_tddft(self, path):
         with open(path / self.out_fn) as handle:
             text = handle.read()
-        td_re = r"Excited State\s*\d+:\s*[\.\w\?-]+\s*([\d\.-]+?)\s*eV"
-        matches = re.findall(td_re, text)
+        matches = TD_RE.findall(text)
         assert len(matches) == self.nstates
         # Excitation energies in eV
-        exc_energies = np.array(matches, dtype=np.float64)
+        exc_energies = np.fromiter(
+            (float(m) for m in matches), dtype=np.float64, count=self.nstates
+        )
         # Convert to Hartree
-        exc_energies /= AU2EV
+        exc_energies *= 1.0 / AU2EV
         return exc_energies
 
-    @file_or_str(".log", method=True)
-    def parse_log(self, text):
-        def parse(text, regex, func):
-            mobj = re.search(regex, text)
-            return func(mobj[1])
-
+    def parse_log(self, log):
+        """Parse number of roots and MO counts from a .log file or its contents."""
+        handle = open(log) if str(log).endswith(".log") else io.StringIO(log)
         # Depending on wether we did the calculation with td=read or not
         # roots will be at a different value. Without reading the CI coeffs
         # from the checkpoint Gaussian will calculate four times as much roots
         # as requested in the first iterations of the calculation. This will
         # lead to a much higher number of expected number of CI-coefficients
         # when parsing the 635r dump later on.
-        roots_re = r"Root\s+(\d+)"
-        roots = np.array(re.findall(roots_re, text), dtype=int).max()
+        roots = 0
+        basis_mobj = None
+        act_mobj = None
+        # Single pass over the lines; NBasis/NROrb are only searched until
+        # their first occurence, while all Root lines are needed for the maximum.
+        with handle:
+            for line in handle:
+                if "Root" in line:
+                    for root in ROOTS_RE.findall(line):
+                        roots = max(roots, int(root))
+                if (basis_mobj is None) and ("NBasis=" in line):
+                    basis_mobj = BASIS_RE.search(line)
+                if (act_mobj is None) and ("NROrb=" in line):
+                    act_mobj = ACT_RE.search(line)
 
-        # NBasis=    16 NAE=    12 NBE=    12 NFC=     6 NFV=     0
-        basis_re = "NBasis=(.+)NAE=(.+)NBE=(.+)NFC=(.+)NFV=(.+)"
-        basis_mobj = re.search(basis_re, text)
         basis_funcs, alpha, beta, _, _ = [int(n) for n in basis_mobj.groups()]
         a_occ = alpha
         b_occ = beta
         a_vir = basis_funcs - a_occ
         b_vir = basis_funcs - b_occ
         restricted = alpha == beta
-        act_re = "NROrb=(.*)NOA=(.*)NOB=(.*)NVA=(.*)NVB=(.*)"
-        act_mobj = re.search(act_re, text)
         _, a_act, b_act, _, _ = [int(n) for n in act_mobj.groups()]
         a_core = a_occ - a_act
         b_core = b_occ - b_act
 
-        NMOs = namedtuple(
-            "NMOs",
-            "a_core, a_occ a_act a_vir " "b_core b_occ b_act b_vir " "restricted",
-        )
-
         nmos = NMOs(
             a_core, a_occ, a_act, a_vir, b_core, b_occ, b_act, b_vir, restricted
         )
@@ -484,11 +585,10 @@ class Gaussian16(OverlapCalculator):
         self.log(f"Parsing 635r dump '{dump_path}'")
         with open(dump_path) as handle:
             text = handle.read()
-        regex = r"read left to right\):\s*(.+)"
-        mobj = re.search(regex, text, re.DOTALL)
-        arr_str = mobj[1].replace("D", "E")
+        mobj = DUMP_635R_RE.search(text)
+        arr_str = mobj[1].translate(D2E)
         # Drop the first 12 items as they are always 0
-        tmp = np.array(arr_str.split()[12:], dtype=np.float64)
+        tmp = np.fromstring(arr_str, sep=" ")[12:]
 
         # the core electrons are frozen in TDDFT/TDA
         expected = (nmos.a_act * nmos.a_vir + nmos.b_act * nmos.b_vir) * roots * 2
@@ -506,7 +606,8 @@ class Gaussian16(OverlapCalculator):
         # core orbitals are neglected.
         if nmos.restricted:
             XpY, XmY = coeffs.reshape(2, roots, 2, -1)
-            X = 0.5 * (XpY + XmY)
+            X = XpY + XmY
+            X *= 0.5
             # Within a TDA calculation XpY and XmY are the same and
             # Y will only contain zeros.
             Y = XpY - X
@@ -618,8 +719,10 @@ class Gaussian16(OverlapCalculator):
         tril_inds = np.tril_indices(grad.size)
         full_hessian = np.zeros((grad.size, grad.size))
         full_hessian[tril_inds] = tril_hess
-        triu_inds = np.triu_indices(grad.size, k=1)
-        full_hessian[triu_inds] = full_hessian.T[triu_inds]
+        # Mirror the lower triangle; the diagonal would be counted twice.
+        diag = np.diag(full_hessian).copy()
+        full_hessian += full_hessian.T
+        np.fill_diagonal(full_hessian, diag)
         results = {
             "energy": fchk_dict[en_key],
             "forces": -grad,
@@ -628,58 +731,19 @@ class Gaussian16(OverlapCalculator):
         return results
 
     def parse_double_mol(self, path, out_fn=None):
-        def repl_double(s, loc, toks):
-            return toks[0].replace("D", "E")
-
         if out_fn is None:
             out_fn = self.out_fn
 
         with open(path / out_fn) as handle:
             text = handle.read()
         # Number of basis functions in the double molecule
-        nbas = int(re.search(r"NBasis =\s*(\d+)", text)[1])
+        nbas = int(NBAS_RE.search(text)[1])
         assert nbas % 2 == 0
-        # Gaussian prints columns of a triangular matrix including
-        # the diagonal
-        backup_white = pp.ParserElement.DEFAULT_WHITE_CHARS
-        pp.ParserElement.setDefaultWhitespaceChars(" \t")
-        int_ = pp.Suppress(pp.Word(pp.nums))
-
-        float_ = pp.Word(pp.nums + ".D+-").setParseAction(repl_double)
-        nl = pp.Suppress(pp.Literal("\n"))
-        header = pp.OneOrMore(int_) + nl
-        line = int_ + pp.OneOrMore(float_) + nl
-
-        block = pp.Group(header + pp.OneOrMore(~header + line))
-
-        parser = pp.Suppress(
-            pp.SkipTo("*** Overlap *** \n", include=True)
-        ) + pp.OneOrMore(block).setResultsName("blocks")
-
-        result = parser.parseFile(path / out_fn)
-        pp.ParserElement.setDefaultWhitespaceChars(backup_white)
-
-        # The full double molecule overlap matrix (square)
-        full_mat = np.zeros((nbas, nbas))
-
-        def get_block_inds(block_ind, nbas, cols=5):
-            """Returns the indices as required to assign the matrix
-            printed by Gaussian. Gaussian prints a lower triangle
-            matrix in blocks of five columns each."""
-            start_row = block_ind * cols
-            start_col = start_row
-            inds = list()
-            for row in range(start_row, nbas):
-                col = start_col
-                while (col <= row) and (col < start_row + cols):
-                    inds.append((row, col))
-                    col += 1
-            return inds
-
-        for i, block in enumerate(result["blocks"]):
-            rows, cols = zip(*get_block_inds(i, nbas))
-            full_mat[rows, cols] = block.asList()
-
+        # Gaussian prints a lower triangle matrix, including the diagonal,
+        # in blocks of five columns each. Every block starts with a header
+        # line holding the column numbers, followed by the rows, each
+        # starting with the row number.
+        ncols = 5
         nbas_single = nbas // 2
         """The whole matrix consists of four blocks:
             Original overlaps of molecule 1
@@ -691,8 +755,36 @@ class Gaussian16(OverlapCalculator):
                 b3 = full_mat[nbas_single:, :nbas_single]
             Original overlaps of molecule 2
                 b4 = full_mat[nbas_single:, nbas_single:]
+
+        Only b3 is needed, so only the rows >= nbas_single of the column blocks
+        starting below nbas_single are parsed.
         """
-        double_mol_ovlp = full_mat[nbas_single:, :nbas_single]
+        starts = range(0, nbas_single, ncols)
+        # Header line + rows for every block
+        block_nlines = [1 + nbas - start for start in starts]
+        header_inds = it.accumulate(block_nlines, initial=0)
+        ovlp_start = text.index("*** Overlap *** \n") + len("*** Overlap *** \n")
+        nlines = sum(block_nlines)
+        lines = text[ovlp_start:].split("\n", nlines)[:nlines]
+        data = " ".join(
+            [
+                line.split(None, 1)[1]
+                for start, header_ind in zip(starts, header_inds)
+                for line in lines[
+                    header_ind + 1 + nbas_single - start : header_ind + 1 + nbas - start
+                ]
+            ]
+        )
+        vals = np.fromstring(data.translate(D2E), sep=" ")
+
+        rows, cols = get_block_inds(
+            nbas, cols=ncols, first_row=nbas_single, stop=nbas_single
+        )
+        rows -= nbas_single
+        # The last block may extend into the columns of molecule 2
+        b3_mask = cols < nbas_single
+        double_mol_ovlp = np.zeros((nbas_single, nbas_single))
+        double_mol_ovlp[rows[b3_mask], cols[b3_mask]] = vals[b3_mask]
         return double_mol_ovlp
 
     def parse_charges(self, path=None):
@@ -1,13 +1,29 @@
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
+from functools import partial
+import itertools as it
 import struct
 import socket
 
 import numpy as np
 
-from pysisyphus.socket_helper import send_closure, recv_closure, get_fmts
+from pysisyphus.socket_helper import (
+    send_closure,
+    recv_closure,
+    recv_into_exact,
+    sendmsg_all,
+    get_fmts,
+)
 
 
 def ipi_client(
-    addr, atoms, energy_getter, forces_getter, hessian_getter=None, hdrlen=12
+    addr,
+    atoms,
+    energy_getter,
+    forces_getter,
+    hessian_getter=None,
+    hdrlen=12,
+    verbose=True,
 ):
     atom_num = len(atoms)
     # Number of entries in a Caretsian forces/coords vector
@@ -16,10 +32,14 @@ def ipi_client(
     # Bytes needed, to store a forces/coords vector
     floats_bytes = 8 * cartesians
     # Virial is hardcoded to the zero vector.
-    VIRIAL = struct.pack("d" * 9, *np.zeros(9))
+    VIRIAL = np.zeros(9).tobytes()
     ZERO = struct.pack("i", 0)
 
-    fmts = get_fmts(cartesians)
+    fmts = get_fmts()
+    FORCEREADY = f"{'FORCEREADY': <{hdrlen}}".encode("ascii")
+    HESSIANREADY = f"{'HESSIANREADY': <{hdrlen}}".encode("ascii")
+    # Reused buffer for the (inverse) cell vectors, that we don't use.
+    cell_buf = bytearray(fmts["nine_floats"].size)
 
     # Unix socket is hardcoded right now, but may also be inet-socket
     sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
@@ -40,9 +60,7 @@ def ipi_client(
             if status == "NEEDPOS":
                 send_msg("HAVEPOS")
                 _ = recv_msg(4, fmt="int")[0]  # Recive atom num from IPI
-                coords = np.array(
-                    recv_msg(floats_bytes, "floats")
-                )  # Receive current coords
+                coords = recv_msg(floats_bytes, "floats")  # Receive current coords
                 assert coords.size % 3 == 0  # Assert Cartesian coordinates
                 send_msg(atom_num, "int")
                 # Just send back the current coordinates or translate all atoms in +X
@@ -61,12 +79,12 @@ def ipi_client(
             recv_msg(expect="POSDATA")
             # Receive cell vectors, inverse cell vectors and number of atoms ...
             # but we don't use them here, so we don't even try to convert them to something.
-            sock.recv(72)  # cell
-            sock.recv(72)  # icell
+            recv_into_exact(sock, cell_buf)  # cell
+            recv_into_exact(sock, cell_buf)  # icell
             ipi_atom_num = recv_msg(4, fmt="int")[0]
             assert ipi_atom_num == atom_num
             # ... and the current coordinates.
-            coords = np.array(recv_msg(floats_bytes, "floats"))
+            coords = recv_msg(floats_bytes, "floats")
 
             recv_msg(expect="STATUS")
             # Indicate, that calculation is possible
@@ -75,37 +93,117 @@ def ipi_client(
             # Acutal QC calculations
             if get_what == "GETENERGY":
                 energy = energy_getter(coords)
-                print(f"Calculated energy: {energy:.6f}, counter={counter}")
+                if verbose:
+                    print(f"Calculated energy: {energy:.6f}, counter={counter}")
                 send_msg("ENERGYREADY")
                 send_msg(energy, "float")
             if get_what == "GETFORCE":
                 forces, energy = forces_getter(coords)
-                print(f"Calculated energy & forces: {energy:.6f}, counter={counter}")
-                send_msg("FORCEREADY")
-                # Send everything to the server
-                send_msg(energy, "float")
-                send_msg(atom_num, "int")
-                send_msg(forces, "floats")
-                send_msg(VIRIAL, packed=True)
-                # We don't want to send additional information, so just send 0.
-                send_msg(ZERO, packed=True)
+                if verbose:
+                    print(
+                        f"Calculated energy & forces: {energy:.6f}, counter={counter}"
+                    )
+                # Send everything to the server at once. We don't want to send
+                # additional information, so the final integer is just 0.
+                sendmsg_all(
+                    sock,
+                    (
+                        FORCEREADY,
+                        fmts["float"].pack(energy),
+                        fmts["int"].pack(atom_num),
+                        np.ascontiguousarray(forces, dtype=float),
+                        VIRIAL,
+                        ZERO,
+                    ),
+                )
             elif get_what == "GETHESSIAN":
                 hessian, energy = hessian_getter(coords)
-                hessian_packed = struct.pack("d" * cartesians ** 2, *hessian.flatten())
-                print(f"Calculated energy & Hessian: {energy:.6f}, counter={counter}")
-                send_msg("HESSIANREADY")
-                # Send everything to the server
-                send_msg(energy, "float")
-                send_msg(atom_num, "int")
-                send_msg(hessian_packed, packed=True)
+                if verbose:
+                    print(
+                        f"Calculated energy & Hessian: {energy:.6f}, counter={counter}"
+                    )
+                # The Hessian buffer is handed to the socket as is, without
+                # an intermediate copy or boxing every entry into a Python float.
+                sendmsg_all(
+                    sock,
+                    (
+                        HESSIANREADY,
+                        fmts["float"].pack(energy),
+                        fmts["int"].pack(atom_num),
+                        np.ascontiguousarray(hessian, dtype=float),
+                    ),
+                )
 
             counter += 1
         except Exception as err:
             raise err
 
 
-def calc_ipi_client(addr, atoms, calc, queue=None, **kwargs):
+def _num_hess_task(calc, atoms, base_name, calc_number, func_name, coords):
+    """Run one calculation of a finite difference Hessian.
+
+    Every task works on its own copy of the calculator with a distinct name,
+    so the tasks don't overwrite each other's files, and uses only one core."""
+    calc = copy(calc)
+    calc.base_name = base_name
+    calc.calc_number = calc_number
+    calc.pal = 1
+    return getattr(calc, func_name)(atoms, coords)
+
+
+def parallel_num_hessian(
+    calc, atoms, coords, executor, step_size=0.005, base_name=None
+):
+    """Central finite difference Hessian with displaced force calculations
+    distributed over the processes of executor."""
+    if base_name is None:
+        base_name = f"{calc.base_name}_num_hess"
+    size = coords.size
+    steps = step_size * np.eye(size)
+    # All 2 * 3N displaced geometries; first all +h, then all -h displacements.
+    displ_coords = np.concatenate((coords + steps, coords - steps))
+    task = partial(_num_hess_task, calc, atoms, base_name)
+    energy = executor.submit(task, 0, "get_energy", coords)
+    forces = np.array(
+        [
+            results["forces"]
+            for results in executor.map(
+                task,
+                range(1, len(displ_coords) + 1),
+                it.repeat("get_forces"),
+                displ_coords,
+            )
+        ]
+    )
+    # Gradient is the negative of the forces
+    hessian = (forces[size:] - forces[:size]) / (2 * step_size)
+    # Symmetrize
+    hessian = (hessian + hessian.T) / 2
+    return hessian, energy.result()["energy"]
+
+
+def calc_ipi_client(
+    addr,
+    atoms,
+    calc,
+    queue=None,
+    parallel_hessian=False,
+    max_workers=None,
+    **kwargs,
+):
+    """Serve a pysisyphus calculator to an i-PI server.
+
+    With parallel_hessian=True Hessians are calculated by finite differences
+    of forces, with the displaced calculations distributed over max_workers
+    processes (default: number of CPUs). Only useful for calculators that
+    lack analytical Hessians.
+    """
     assert calc is not None, "Supplied calculator must not be None!"
+    # The same pool is used for all Hessians
+    executor = (
+        ProcessPoolExecutor(max_workers=max_workers) if parallel_hessian else None
+    )
+    hess_counter = 0
 
     def energy_getter(coords):
         if queue is not None:
@@ -123,11 +221,29 @@ def calc_ipi_client(addr, atoms, calc, queue=None, **kwargs):
         return forces, energy
 
     def hessian_getter(coords):
+        nonlocal hess_counter
+
         if queue is not None:
             queue.put(("coords", coords))
+        if parallel_hessian:
+            step_size = calc.num_hess_kwargs.get("step_size", 0.005)
+            base_name = f"{calc.base_name}_num_hess_{hess_counter:03d}"
+            hess_counter += 1
+            return parallel_num_hessian(
+                calc,
+                atoms,
+                coords,
+                executor,
+                step_size=step_size,
+                base_name=base_name,
+            )
         results = calc.get_hessian(atoms, coords)
         hessian = results["hessian"]
         energy = results["energy"]
         return hessian, energy
 
-    ipi_client(addr, atoms, energy_getter, forces_getter, hessian_getter, **kwargs)
+    try:
+        ipi_client(addr, atoms, energy_getter, forces_getter, hessian_getter, **kwargs)
+    finally:
+        if executor is not None:
+            executor.shutdown()
@@ -1,8 +1,6 @@
 import os
 import socket
 
-import numpy as np
-
 from pysisyphus.calculators.Calculator import Calculator
 from pysisyphus.socket_helper import (
     send_closure,
@@ -108,7 +106,7 @@ class IPIServer(Calculator):
         recv_msg(4, fmt="int", expect="zero")
         results = {
             "energy": energy,
-            "forces": np.array(forces),
+            "forces": forces,
         }
         return results
 
@@ -122,7 +120,7 @@ class IPIServer(Calculator):
         self.listen_for_client_atom_num(atom_num)
         coord_num = 3 * atom_num
         hessian = recv_msg(coord_num ** 2 * 8, fmt="floats_sq", expect="Hessian")
-        hessian = np.array(hessian).reshape(-1, coord_num)
+        hessian = hessian.reshape(-1, coord_num)
         results = {
             "energy": energy,
             "hessian": hessian,
@@ -133,7 +131,6 @@ class IPIServer(Calculator):
         assert kind in self.listen_kinds
 
         atom_num = len(atoms)
-        coords_num = len(coords)
 
         # Setup connection
         if (self._client_conn is None) or (self._client_address is None):
@@ -145,7 +142,7 @@ class IPIServer(Calculator):
                 conn_msg = "Got new connection."
             self.log(conn_msg)
             # Create send/receive functions for this connection
-            self.fmts = get_fmts(coords_num)
+            self.fmts = get_fmts()
             self.send_msg = send_closure(
                 self._client_conn, self.hdrlen, self.fmts, verbose=self.verbose
             )
@@ -173,7 +170,7 @@ class IPIServer(Calculator):
             # Receive atom number and potentially modified coordinates from the client.
             self.listen_for_client_atom_num(atom_num)
             new_coords = recv_msg(atom_num * 3 * 8, fmt="floats")
-            results = {"coords": np.array(new_coords)}
+            results = {"coords": new_coords}
         # The path below leads to sending of coordinates and calculation of
         # energy and maybe its derivatives by the client.
         else:
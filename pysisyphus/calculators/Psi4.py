@@ -6,6 +6,9 @@ import numpy as np
 from pysisyphus.calculators.Calculator import Calculator
 
 
+EN_RE = re.compile(r"PARSE ENERGY: ([\d\-\.]+)")
+
+
 class Psi4(Calculator):
 
     conf_key = "psi4"
@@ -192,14 +195,13 @@ class Psi4(Calculator):
     def parse_energy(self, path):
         with open(path / "psi4.out") as handle:
             text = handle.read()
-        en_regex = re.compile(r"PARSE ENERGY: ([\d\-\.]+)")
-        mobj = en_regex.search(text)
+        mobj = EN_RE.search(text)
         result = {"energy": float(mobj[1])}
         return result
 
     def parse_grad(self, path):
         gradient = np.load(path / "grad.npy")
-        forces = -gradient.flatten()
+        forces = -gradient.ravel()
         result = {
             "forces": forces,
         }
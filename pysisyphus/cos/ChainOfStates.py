@@ -1,4 +1,5 @@
 from copy import copy
+import itertools as it
 import logging
 import sys
 
@@ -31,6 +32,7 @@ class ChainOfStates:
         climb_fixed=True,
         energy_min_mix=False,
         scheduler=None,
+        batch_size=1,
         progress=False,
     ):
         assert len(images) >= 2, "Need at least 2 images!"
@@ -46,6 +48,8 @@ class ChainOfStates:
         # Must not be lower than climb_rms
         self.climb_lanczos_rms = min(self.climb_rms, climb_lanczos_rms)
         self.scheduler = scheduler
+        # Number of images that are calculated serially in one dask task
+        self.batch_size = max(batch_size, 1)
         self.progress = progress
 
         self._coords = None
@@ -230,6 +234,9 @@ class ChainOfStates:
         image.calc_energy_and_forces()
         return image
 
+    def par_image_calc_batch(self, images):
+        return [self.par_image_calc(image) for image in images]
+
     def set_images(self, indices, images):
         for ind, image in zip(indices, images):
             self.images[ind] = image
@@ -246,6 +253,26 @@ class ChainOfStates:
         n_workers = len(client.scheduler_info()["workers"])
         # number of images to calculate
         n_images = len(images_to_calculate)
+
+        # Submit batches of images, where each worker calculates the images in
+        # a batch one after another. Larger batches need fewer scheduler
+        # roundtrips, smaller batches allow more images to run concurrently.
+        if self.batch_size > 1:
+            batches = [
+                images_to_calculate[i : i + self.batch_size]
+                for i in range(0, n_images, self.batch_size)
+            ]
+            # Divide pal by the number of concurrently running batches
+            new_pal = max(1, orig_pal // min(n_workers, len(batches)))
+            for image in images_to_calculate:
+                image.calculator.pal = new_pal
+            batch_futures = client.map(self.par_image_calc_batch, batches)
+            calculated = it.chain(*client.gather(batch_futures))
+            self.set_images(image_indices, calculated)
+            for image in self.images:
+                image.calculator.pal = orig_pal
+            return
+
         # divide pal by the number of workers (or 1 if more workers)
         new_pal = max(1, orig_pal // n_workers)
 
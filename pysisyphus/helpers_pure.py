@@ -72,27 +72,46 @@ def sort_by_central(set1, set2):
 
 
 def merge_sets(fragments):
-    """Merge a list of iterables."""
-    # Hold the final fragments that can't be merged further, as they
-    # contain distinct atoms.
-    fragments = [frozenset(frag) for frag in fragments]
-    merged = list()
-    while len(fragments) > 0:
-        popped = fragments.pop(0)
-        # Look for an intersection between the popped unmerged fragment
-        # and the remaining unmerged fragments.
-        for frag in fragments:
-            if popped & frag:
-                fragments.remove(frag)
-                # If a intersecting unmerged fragment is found merge
-                # both fragments and append them at the end.
-                fragments.append(popped | frag)
-                break
-        else:
-            # Add the unmerged fragment into merged if it doesn't
-            # intersect with any other unmerged fragment.
-            merged.append(popped)
-    return merged
+    """Merge a list of iterables.
+
+    Iterables sharing at least one item are merged, using a union-find
+    (disjoint set) structure with path compression and union by size.
+    Merged fragments are returned in order of their first appearing item."""
+    parent = dict()
+    size = dict()
+
+    def find(item):
+        root = item
+        while parent[root] != root:
+            root = parent[root]
+        # Path compression
+        while parent[item] != root:
+            parent[item], item = root, parent[item]
+        return root
+
+    for frag in fragments:
+        frag = list(frag)
+        for item in frag:
+            if item not in parent:
+                parent[item] = item
+                size[item] = 1
+        if not frag:
+            continue
+        root = find(frag[0])
+        for item in frag[1:]:
+            other = find(item)
+            if other == root:
+                continue
+            # Attach the smaller tree to the bigger one
+            if size[root] < size[other]:
+                root, other = other, root
+            parent[other] = root
+            size[root] += size[other]
+
+    merged = dict()
+    for item in parent:
+        merged.setdefault(find(item), set()).add(item)
+    return [frozenset(frag) for frag in merged.values()]
 
 
 def remove_duplicates(seq):
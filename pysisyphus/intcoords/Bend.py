@@ -4,6 +4,7 @@ import numpy as np
 
 from pysisyphus.intcoords.Primitive import Primitive
 from pysisyphus.intcoords.derivatives import d2q_a
+from pysisyphus.intcoords.jit import HAS_NUMBA, bend_terms
 from pysisyphus.linalg import cross3, norm3
 
 
@@ -27,7 +28,12 @@ class Bend(Primitive):
         u = u_dash / u_norm
         v = v_dash / v_norm
 
-        udv = max(-1.0, min(1.0, u.dot(v)))
+        udv = u.dot(v)
+        # Restrict udv to the allowed interval for arccos [-1, 1]
+        if udv > 1.0:
+            udv = 1.0
+        elif udv < -1.0:
+            udv = -1.0
         angle_rad = np.arccos(udv)
 
         if gradient:
@@ -64,6 +70,61 @@ class Bend(Primitive):
             return angle_rad, row
         return angle_rad
 
+    @staticmethod
+    def _calculate_batch(coords3d, indices, gradient=False, out=None, out_rows=None):
+        """Vectorized _calculate for an (N, 3) array of indices."""
+        if HAS_NUMBA:
+            angles_rad, terms = bend_terms(coords3d, indices, gradient)
+            if gradient:
+                return angles_rad, Bend._batch_rows(
+                    coords3d, indices, terms, out=out, out_rows=out_rows
+                )
+            return angles_rad
+
+        m, o, n = indices.T
+        u_dash = coords3d[m] - coords3d[o]
+        v_dash = coords3d[n] - coords3d[o]
+        u_norm = np.linalg.norm(u_dash, axis=1)[:, None]
+        v_norm = np.linalg.norm(v_dash, axis=1)[:, None]
+        u = u_dash / u_norm
+        v = v_dash / v_norm
+
+        udv = np.clip(np.einsum("ij,ij->i", u, v), -1.0, 1.0)
+        angles_rad = np.arccos(udv)
+
+        if gradient:
+            cross_vec1 = np.array((1, -1, 1))
+            cross_vec2 = np.array((-1, 1, 1))
+
+            def parallel(vecs):
+                dot = np.einsum("ij,ij->i", u, vecs) / np.linalg.norm(vecs, axis=1)
+                return ((1 - np.abs(dot)) < 1e-6)[:, None]
+
+            # See Bend._calculate
+            cross_vecs = np.where(
+                parallel(v),
+                np.where(
+                    parallel(np.broadcast_to(cross_vec1, u.shape)),
+                    cross_vec2,
+                    cross_vec1,
+                ),
+                v,
+            )
+
+            w_dash = np.cross(u, cross_vecs)
+            w = w_dash / np.linalg.norm(w_dash, axis=1)[:, None]
+
+            first_term = np.cross(u, w) / u_norm
+            second_term = np.cross(w, v) / v_norm
+            terms = np.stack(
+                (first_term, -first_term - second_term, second_term), axis=1
+            )
+            rows = Bend._batch_rows(
+                coords3d, indices, terms, out=out, out_rows=out_rows
+            )
+            return angles_rad, rows
+        return angles_rad
+
     @staticmethod
     def _jacobian(coords3d, indices):
         return d2q_a(*coords3d[indices].flatten())
@@ -1,6 +1,7 @@
 import numpy as np
 
 from pysisyphus.intcoords.Torsion import Torsion
+from pysisyphus.linalg import norm3
 
 
 class DummyImproper(Torsion):
@@ -23,7 +24,7 @@ class DummyImproper(Torsion):
         B = coords3d[b]
         # Bond, pointing away from a to c
         AC_ = coords3d[c] - coords3d[a]
-        AC = AC_ / np.linalg.norm(AC_)
+        AC = AC_ / norm3(AC_)
 
         w = DummyImproper._get_cross_vec(coords3d, indices).flatten()
         dummy_vec = (np.eye(3) - np.outer(AC, AC)) @ w
@@ -41,9 +41,29 @@ class Primitive(metaclass=abc.ABCMeta):
         x_dash = coords3d[n] - coords3d[m]
         x = x_dash / norm3(x_dash)
         cross_vecs = np.eye(3)
-        min_ind = np.argmin([np.dot(cv, x) ** 2 for cv in cross_vecs])
+        # The squared projections of x onto the Cartesian unit vectors are
+        # just the squared components of x.
+        min_ind = np.argmin(x * x)
         return cross_vecs[min_ind]
 
+    @staticmethod
+    def _batch_rows(coords3d, indices, terms, out=None, out_rows=None):
+        """Scatter per-atom gradient terms of shape (N, k, 3) into N B-matrix
+        rows, given an (N, k) array of atom indices.
+
+        Only the 3k nonzero entries of every row are written, addressed by
+        flat indices into the (N, coords3d.size) array. When a zeroed,
+        C-contiguous array 'out' is given, the terms are written into its
+        rows 'out_rows' instead and 'out' is returned."""
+        if out is None:
+            out = np.zeros((len(indices), coords3d.size))
+            out_rows = np.arange(len(indices))
+        # Column indices of the x, y and z components of every atom
+        cols = 3 * indices[:, :, None] + np.arange(3)
+        flat_inds = np.asarray(out_rows)[:, None, None] * coords3d.size + cols
+        out.flat[flat_inds.ravel()] = terms.ravel()
+        return out
+
     def set_cross_vec(self, coords3d, indices):
         self.cross_vec = self._get_cross_vec(coords3d, self.indices)
         self.log(f"Cross vector for {self} set to {self.cross_vec}")
@@ -21,6 +21,7 @@ from pysisyphus.linalg import svd_inv
 from pysisyphus.intcoords.exceptions import PrimitiveNotDefinedException
 from pysisyphus.intcoords.update import transform_int_step
 from pysisyphus.intcoords.eval import (
+    eval_B,
     eval_primitives,
     check_primitives,
 )
@@ -571,11 +572,7 @@ class RedundantCoords:
         self.log(f"Backtransformation {self.backtransform_counter}")
 
         def Bt_inv_prim_getter(cart_coords):
-            coords3d = cart_coords.reshape(-1, 3)
-            B_prim = np.zeros((len(self.primitives), coords3d.size))
-            for i, primitive in enumerate(self.primitives):
-                _, gradient = primitive.calculate(coords3d, gradient=True)
-                B_prim[i] = gradient
+            B_prim = eval_B(cart_coords.reshape(-1, 3), self.primitives)
             return self.inv_Bt(B_prim)
 
         new_prim_internals, cart_step, failed = transform_int_step(
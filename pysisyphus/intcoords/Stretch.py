@@ -26,6 +26,21 @@ class Stretch(Primitive):
             return bond_length, row
         return bond_length
 
+    @staticmethod
+    def _calculate_batch(coords3d, indices, gradient=False, out=None, out_rows=None):
+        """Vectorized _calculate for an (N, 2) array of indices."""
+        n, m = indices.T
+        bonds = coords3d[m] - coords3d[n]
+        bond_lengths = np.linalg.norm(bonds, axis=1)
+        if gradient:
+            bonds_normed = bonds / bond_lengths[:, None]
+            terms = np.stack((-bonds_normed, bonds_normed), axis=1)
+            rows = Stretch._batch_rows(
+                coords3d, indices, terms, out=out, out_rows=out_rows
+            )
+            return bond_lengths, rows
+        return bond_lengths
+
     @staticmethod
     def _jacobian(coords3d, indices):
         return d2q_b(*coords3d[indices].flatten())
@@ -5,6 +5,7 @@ import numpy as np
 from pysisyphus.intcoords.Primitive import Primitive
 from pysisyphus.intcoords import Bend
 from pysisyphus.intcoords.derivatives import d2q_d2
+from pysisyphus.intcoords.jit import HAS_NUMBA, torsion_terms
 from pysisyphus.linalg import cross3, norm3
 
 
@@ -41,7 +42,10 @@ class Torsion(Primitive):
         vxw = cross3(v, w)
         cos_dihed = uxw.dot(vxw) / (np.sin(phi_u) * np.sin(phi_v))
         # Restrict cos_dihed to the allowed interval for arccos [-1, 1]
-        cos_dihed = min(1, max(cos_dihed, -1))
+        if cos_dihed > 1.0:
+            cos_dihed = 1.0
+        elif cos_dihed < -1.0:
+            cos_dihed = -1.0
 
         dihedral_rad = np.arccos(cos_dihed)
 
@@ -95,6 +99,61 @@ class Torsion(Primitive):
             return dihedral_rad, row
         return dihedral_rad
 
+    @staticmethod
+    def _calculate_batch(coords3d, indices, gradient=False, out=None, out_rows=None):
+        """Vectorized _calculate for an (N, 4) array of indices."""
+        if HAS_NUMBA:
+            dihedrals_rad, terms = torsion_terms(coords3d, indices, gradient)
+            if gradient:
+                return dihedrals_rad, Torsion._batch_rows(
+                    coords3d, indices, terms, out=out, out_rows=out_rows
+                )
+            return dihedrals_rad
+
+        m, o, p, n = indices.T
+        u_dash = coords3d[m] - coords3d[o]
+        v_dash = coords3d[n] - coords3d[p]
+        w_dash = coords3d[p] - coords3d[o]
+        u_norm = np.linalg.norm(u_dash, axis=1)[:, None]
+        v_norm = np.linalg.norm(v_dash, axis=1)[:, None]
+        w_norm = np.linalg.norm(w_dash, axis=1)[:, None]
+        u = u_dash / u_norm
+        v = v_dash / v_norm
+        w = w_dash / w_norm
+        phi_u = np.arccos(np.einsum("ij,ij->i", u, w))
+        phi_v = np.arccos(-np.einsum("ij,ij->i", w, v))
+        uxw = np.cross(u, w)
+        vxw = np.cross(v, w)
+        cos_diheds = np.einsum("ij,ij->i", uxw, vxw) / (np.sin(phi_u) * np.sin(phi_v))
+        cos_diheds = np.clip(cos_diheds, -1.0, 1.0)
+
+        dihedrals_rad = np.arccos(cos_diheds)
+        # See Torsion._calculate for the sign convention.
+        invert = (dihedrals_rad != np.pi) & (np.einsum("ij,ij->i", vxw, u) < 0)
+        dihedrals_rad[invert] *= -1
+
+        if gradient:
+            sin2_u = (np.sin(phi_u) ** 2)[:, None]
+            sin2_v = (np.sin(phi_v) ** 2)[:, None]
+            first_term = uxw / (u_norm * sin2_u)
+            second_term = vxw / (v_norm * sin2_v)
+            third_term = uxw * np.cos(phi_u)[:, None] / (w_norm * sin2_u)
+            fourth_term = -vxw * np.cos(phi_v)[:, None] / (w_norm * sin2_v)
+            terms = np.stack(
+                (
+                    first_term,
+                    -first_term + third_term - fourth_term,
+                    second_term - third_term + fourth_term,
+                    -second_term,
+                ),
+                axis=1,
+            )
+            rows = Torsion._batch_rows(
+                coords3d, indices, terms, out=out, out_rows=out_rows
+            )
+            return dihedrals_rad, rows
+        return dihedrals_rad
+
     @staticmethod
     def _jacobian(coords3d, indices):
         sign = np.sign(Torsion._calculate(coords3d, indices))
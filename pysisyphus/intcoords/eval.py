@@ -3,6 +3,15 @@ import random
 
 import numpy as np
 
+from pysisyphus.intcoords.Bend import Bend
+from pysisyphus.intcoords.Stretch import Stretch
+from pysisyphus.intcoords.Torsion import Torsion
+
+
+# Primitives that provide a vectorized '_calculate_batch' method. Subclasses
+# may override '_calculate', so only exact type matches are batched.
+BATCH_TYPES = (Stretch, Bend, Torsion)
+
 
 class PrimInternal:
     def __init__(self, inds, val, grad=None):
@@ -17,18 +26,38 @@ class PrimInternal:
         return f"PrimInternal({self.inds}, {self.val:.4f})"
 
 
-def eval_primitives(coords3d, primitives):
-    prim_internals = list()
-    for primitive in primitives:
-        value, gradient = primitive.calculate(coords3d, gradient=True)
-        prim_internal = PrimInternal(primitive.indices, value, gradient)
-        prim_internals.append(prim_internal)
+def eval_primitives(coords3d, primitives, B=None):
+    """Evaluate primitive internals and their gradients.
+
+    All gradients are written into the rows of a single (nprims, 3N) array,
+    that may also be supplied as zeroed 'B'. PrimInternal.grad holds a view
+    of the respective row."""
+    if B is None:
+        B = np.zeros((len(primitives), coords3d.size))
+    prim_internals = [None] * len(primitives)
+    batches = dict()
+    for i, primitive in enumerate(primitives):
+        prim_type = type(primitive)
+        if (prim_type in BATCH_TYPES) and not primitive.cache:
+            batches.setdefault(prim_type, list()).append(i)
+            continue
+        value, B[i] = primitive.calculate(coords3d, gradient=True)
+        prim_internals[i] = PrimInternal(primitive.indices, value, B[i])
+
+    for prim_type, prim_inds in batches.items():
+        indices = np.array([primitives[i].indices for i in prim_inds], dtype=int)
+        values, _ = prim_type._calculate_batch(
+            coords3d, indices, gradient=True, out=B, out_rows=prim_inds
+        )
+        for i, value in zip(prim_inds, values):
+            prim_internals[i] = PrimInternal(primitives[i].indices, value, B[i])
     return prim_internals
 
 
 def eval_B(coords3d, primitives):
-    prim_internals = eval_primitives(coords3d, primitives)
-    return np.array([prim_int.grad for prim_int in prim_internals])
+    B = np.zeros((len(primitives), coords3d.size))
+    eval_primitives(coords3d, primitives, B=B)
+    return B
 
 
 def check_primitives(coords3d, primitives, B=None, thresh=1e-6, logger=None):
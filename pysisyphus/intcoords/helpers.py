@@ -8,6 +8,7 @@ from pysisyphus.intcoords.exceptions import DifferentPrimitivesException
 from pysisyphus.intcoords.RedundantCoords import RedundantCoords
 from pysisyphus.intcoords.setup import get_bond_sets, BOND_FACTOR
 from pysisyphus.intcoords.Stretch import Stretch
+from pysisyphus.linalg import norm3
 
 
 def get_tangent(prims1, prims2, dihedral_inds, normalize=False):
@@ -149,7 +150,7 @@ def get_weighted_bond_mode_getter(
             if fractional:
                 from_, to_ = inds
                 ref_len = CR[atoms[from_].lower()] + CR[atoms[to_].lower()]
-                act_len = np.linalg.norm(coords3d[from_] - coords3d[to_])
+                act_len = norm3(coords3d[from_] - coords3d[to_])
                 fw = (act_len / ref_len) ** weight
                 frac_weights.append(fw)
 
@@ -231,5 +232,5 @@ def interfragment_distance(
 
     frag1_mean = mean_coords(frag1)
     frag2_mean = mean_coords(frag2)
-    interfrag_dist = float(np.linalg.norm(frag1_mean - frag2_mean))
+    interfrag_dist = norm3(frag1_mean - frag2_mean)
     return interfrag_dist
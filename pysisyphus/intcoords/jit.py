@@ -0,0 +1,147 @@
+"""Numba-compiled kernels for batched evaluation of bends and torsions.
+
+Numba is an optional dependency. When it is not available HAS_NUMBA is False
+and the primitives fall back to their pure NumPy implementations.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+
+    HAS_NUMBA = True
+except ModuleNotFoundError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        def wrapper(func):
+            return func
+
+        return wrapper
+
+
+@njit(cache=True)
+def _dot3(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+@njit(cache=True)
+def _norm3(a):
+    return np.sqrt(_dot3(a, a))
+
+
+@njit(cache=True)
+def _cross3(a, b):
+    return np.array(
+        (
+            a[1] * b[2] - a[2] * b[1],
+            a[2] * b[0] - a[0] * b[2],
+            a[0] * b[1] - a[1] * b[0],
+        )
+    )
+
+
+@njit(cache=True)
+def _clamp1(x):
+    # Comparisons compile to selects, unlike the generic min()/max() builtins.
+    return 1.0 if x > 1.0 else (-1.0 if x < -1.0 else x)
+
+
+@njit(cache=True)
+def _parallel(u, v, thresh=1e-6):
+    dot = _dot3(u, v) / (_norm3(u) * _norm3(v))
+    return (1 - abs(dot)) < thresh
+
+
+@njit(cache=True)
+def bend_terms(coords3d, indices, gradient):
+    """Bend values and per-atom gradient terms for an (N, 3) index array.
+
+    Mirrors Bend._calculate. Returns an array of angles and an (N, 3, 3)
+    array holding the gradient terms of atoms m, o and n.
+    """
+    nbends = indices.shape[0]
+    angles_rad = np.empty(nbends)
+    terms = np.zeros((nbends, 3, 3))
+    cross_vec1 = np.array((1.0, -1.0, 1.0))
+    cross_vec2 = np.array((-1.0, 1.0, 1.0))
+    for i in range(nbends):
+        m, o, n = indices[i]
+        u_dash = coords3d[m] - coords3d[o]
+        v_dash = coords3d[n] - coords3d[o]
+        u_norm = _norm3(u_dash)
+        v_norm = _norm3(v_dash)
+        u = u_dash / u_norm
+        v = v_dash / v_norm
+
+        udv = _clamp1(_dot3(u, v))
+        angles_rad[i] = np.arccos(udv)
+
+        if not gradient:
+            continue
+
+        if not _parallel(u, v):
+            cross_vec = v
+        elif not _parallel(u, cross_vec1):
+            cross_vec = cross_vec1
+        else:
+            cross_vec = cross_vec2
+
+        w_dash = _cross3(u, cross_vec)
+        w = w_dash / _norm3(w_dash)
+
+        first_term = _cross3(u, w) / u_norm
+        second_term = _cross3(w, v) / v_norm
+        terms[i, 0] = first_term
+        terms[i, 1] = -first_term - second_term
+        terms[i, 2] = second_term
+    return angles_rad, terms
+
+
+@njit(cache=True)
+def torsion_terms(coords3d, indices, gradient):
+    """Dihedral values and per-atom gradient terms for an (N, 4) index array.
+
+    Mirrors Torsion._calculate. Returns an array of dihedrals and an (N, 4, 3)
+    array holding the gradient terms of atoms m, o, p and n.
+    """
+    ndiheds = indices.shape[0]
+    dihedrals_rad = np.empty(ndiheds)
+    terms = np.zeros((ndiheds, 4, 3))
+    for i in range(ndiheds):
+        m, o, p, n = indices[i]
+        u_dash = coords3d[m] - coords3d[o]
+        v_dash = coords3d[n] - coords3d[p]
+        w_dash = coords3d[p] - coords3d[o]
+        u_norm = _norm3(u_dash)
+        v_norm = _norm3(v_dash)
+        w_norm = _norm3(w_dash)
+        u = u_dash / u_norm
+        v = v_dash / v_norm
+        w = w_dash / w_norm
+        phi_u = np.arccos(_dot3(u, w))
+        phi_v = np.arccos(-_dot3(w, v))
+        uxw = _cross3(u, w)
+        vxw = _cross3(v, w)
+        cos_dihed = _dot3(uxw, vxw) / (np.sin(phi_u) * np.sin(phi_v))
+        cos_dihed = _clamp1(cos_dihed)
+
+        dihedral_rad = np.arccos(cos_dihed)
+        if (dihedral_rad != np.pi) and (_dot3(vxw, u) < 0):
+            dihedral_rad *= -1
+        dihedrals_rad[i] = dihedral_rad
+
+        if not gradient:
+            continue
+
+        sin2_u = np.sin(phi_u) ** 2
+        sin2_v = np.sin(phi_v) ** 2
+        first_term = uxw / (u_norm * sin2_u)
+        second_term = vxw / (v_norm * sin2_v)
+        third_term = uxw * np.cos(phi_u) / (w_norm * sin2_u)
+        fourth_term = -vxw * np.cos(phi_v) / (w_norm * sin2_v)
+        terms[i, 0] = first_term
+        terms[i, 1] = -first_term + third_term - fourth_term
+        terms[i, 2] = second_term - third_term + fourth_term
+        terms[i, 3] = -second_term
+    return dihedrals_rad, terms
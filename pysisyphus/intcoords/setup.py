@@ -8,6 +8,7 @@ import itertools as it
 from typing import Optional
 
 import numpy as np
+from scipy.spatial import cKDTree
 from scipy.spatial.distance import pdist, squareform
 from sklearn.cluster import KMeans
 
@@ -25,9 +26,11 @@ BOND_FACTOR = 1.3
 
 
 def get_pair_covalent_radii(atoms):
-    atoms = [a.lower() for a in atoms]
-    cov_radii = np.array([CR[a.lower()] for a in atoms])
-    pair_cov_radii = np.array([r1 + r2 for r1, r2 in it.combinations(cov_radii, 2)])
+    cov_radii = np.array([CR[atom.lower()] for atom in atoms])
+    # Upper triangle indices are ordered like the condensed distance matrix
+    # returned by pdist.
+    i_inds, j_inds = np.triu_indices(len(cov_radii), k=1)
+    pair_cov_radii = cov_radii[i_inds] + cov_radii[j_inds]
     return pair_cov_radii
 
 
@@ -38,15 +41,38 @@ def get_bond_mat(geom, bond_factor=BOND_FACTOR):
     return bond_mat
 
 
+def get_bond_inds_kdtree(atoms, coords3d, bond_factor=BOND_FACTOR):
+    """Bond indices from a KD-tree search, instead of all pairwise distances.
+
+    Only atom pairs closer than the biggest possible bond length are considered.
+    The bond indices are returned in the same order as in get_bond_sets().
+    """
+    cov_radii = np.array([CR[atom.lower()] for atom in atoms])
+    max_bond_dist = bond_factor * 2 * cov_radii.max(initial=0.0)
+    kdt = cKDTree(coords3d)
+    pair_inds = kdt.query_pairs(max_bond_dist, output_type="ndarray")
+    # Sort lexicographically, as returned by np.triu_indices
+    pair_inds = pair_inds[np.lexsort((pair_inds[:, 1], pair_inds[:, 0]))]
+    i_inds, j_inds = pair_inds.T
+    diffs = coords3d[i_inds] - coords3d[j_inds]
+    # Compare squared distances, so we don't have to take the square root.
+    dists2 = np.einsum("ij,ij->i", diffs, diffs)
+    scaled_cr_sums = bond_factor * (cov_radii[i_inds] + cov_radii[j_inds])
+    bond_inds = pair_inds[dists2 <= scaled_cr_sums**2]
+    return bond_inds
+
+
 def get_bond_sets(
     atoms, coords3d, bond_factor=BOND_FACTOR, return_cdm=False, return_cbm=False
 ):
     """I'm sorry, but this function does not return sets, but an int ndarray."""
+    if not return_cbm and not return_cdm:
+        return get_bond_inds_kdtree(atoms, coords3d, bond_factor=bond_factor)
+
     cdm = pdist(coords3d)
     # Generate indices corresponding to the atom pairs in the
     # condensed distance matrix cdm.
-    atom_inds = list(it.combinations(range(len(coords3d)), 2))
-    atom_inds = np.array(atom_inds, dtype=int)
+    atom_inds = np.stack(np.triu_indices(len(coords3d), k=1), axis=1)
     scaled_cr_sums = bond_factor * get_pair_covalent_radii(atoms)
     # condensed bond matrix
     cbm = cdm <= scaled_cr_sums
@@ -356,8 +382,9 @@ def connect_fragments_ahlrichs(
 
 def get_hydrogen_bond_inds(atoms, coords3d, bond_inds, logger=None):
     tmp_sets = [frozenset(bi) for bi in bond_inds]
-    hydrogen_inds = [i for i, a in enumerate(atoms) if a.lower() == "h"]
-    x_inds = [i for i, a in enumerate(atoms) if a.lower() in "n o f p s cl".split()]
+    atoms_lower = [atom.lower() for atom in atoms]
+    hydrogen_inds = [i for i, a in enumerate(atoms_lower) if a == "h"]
+    x_inds = [i for i, a in enumerate(atoms_lower) if a in "n o f p s cl".split()]
     hydrogen_bond_inds = list()
     for h_ind, x_ind in it.product(hydrogen_inds, x_inds):
         as_set = set((h_ind, x_ind))
@@ -369,7 +396,7 @@ def get_hydrogen_bond_inds(atoms, coords3d, bond_inds, logger=None):
         # angle X-H-Y is greater than 90° a hydrogen bond is asigned.
         y_inds = set(x_inds) - set((x_ind,))
         for y_ind in y_inds:
-            y_atom = atoms[y_ind].lower()
+            y_atom = atoms_lower[y_ind]
             cov_rad_sum = CR["h"] + CR[y_atom]
             distance = Stretch._calculate(coords3d, (h_ind, y_ind))
             vdw_rad_sum = VDW_RADII["h"] + VDW_RADII[y_atom]
@@ -440,17 +467,25 @@ def get_hydrogen_bond_inds_v2(atoms, coords3d, bond_inds, logger=None):
 
 
 def get_bend_inds(coords3d, bond_inds, min_deg, max_deg, logger=None):
-    bond_sets = {frozenset(bi) for bi in bond_inds}
+    bond_sets = list({frozenset(bi) for bi in bond_inds})
+    # Only pairs of bonds sharing a common atom define a bend. Instead of checking
+    # all pairs of bonds, the bonds attached to every atom are paired. The pairs
+    # are visited in the same order as in it.combinations(bond_sets, 2).
+    atom_bonds = dict()
+    for i, bond_set in enumerate(bond_sets):
+        for atom in bond_set:
+            atom_bonds.setdefault(atom, list()).append(i)
+    bond_pairs = sorted(
+        pair for bonds in atom_bonds.values() for pair in it.combinations(bonds, 2)
+    )
 
     bend_inds = list()
-    for bond_set1, bond_set2 in it.combinations(bond_sets, 2):
-        union = bond_set1 | bond_set2
-        if len(union) == 3:
-            indices, _ = sort_by_central(bond_set1, bond_set2)
-            if not bend_valid(coords3d, indices, min_deg, max_deg):
-                log(logger, f"Bend {indices} is not valid!")
-                continue
-            bend_inds.append(indices)
+    for i, j in bond_pairs:
+        indices, _ = sort_by_central(bond_sets[i], bond_sets[j])
+        if not bend_valid(coords3d, indices, min_deg, max_deg):
+            log(logger, f"Bend {indices} is not valid!")
+            continue
+        bend_inds.append(indices)
 
     return bend_inds
 
@@ -486,6 +521,9 @@ def get_dihedral_inds(coords3d, bond_inds, bend_inds, max_deg, logger=None):
     proper_dihedral_inds = list()
     improper_candidates = list()
     improper_dihedral_inds = list()
+    # Sets for fast lookup of already present dihedrals
+    proper_dihedral_set = set()
+    improper_dihedral_set = set()
 
     def log_dihed_skip(inds):
         log(
@@ -496,7 +534,7 @@ def get_dihedral_inds(coords3d, bond_inds, bend_inds, max_deg, logger=None):
 
     def set_dihedral_index(dihedral_ind, proper=True):
         dihed = tuple(dihedral_ind)
-        check_in = proper_dihedral_inds if proper else improper_dihedral_inds
+        check_in = proper_dihedral_set if proper else improper_dihedral_set
         # Check if this dihedral is already present
         if (dihed in check_in) or (dihed[::-1] in check_in):
             return
@@ -504,35 +542,53 @@ def get_dihedral_inds(coords3d, bond_inds, bend_inds, max_deg, logger=None):
         if not dihedral_valid(coords3d, dihedral_ind, deg_thresh=max_deg):
             log_dihed_skip(dihedral_ind)
             return
+        check_in.add(dihed)
         if proper:
             proper_dihedral_inds.append(dihed)
         else:
             improper_dihedral_inds.append(dihed)
 
-    for bond, bend in it.product(bond_inds, bend_inds):
-        central = bend[1]
-        bend_set = set(bend)
-        bond_set = set(bond)
-        # Check if the two sets share one common atom. If not continue.
-        intersect = bend_set & bond_set
-        if len(intersect) != 1:
+    # Instead of checking every combination of bonds and bends for a common
+    # atom, only the bonds attached to the atoms of a bend are considered. The
+    # pairs are visited in the same order as in it.product(bond_inds, bend_inds).
+    bond_inds = list(bond_inds)
+    bend_inds = list(bend_inds)
+    atom_bonds = dict()
+    for i, bond in enumerate(bond_inds):
+        for atom in bond:
+            atom_bonds.setdefault(atom, set()).add(i)
+    bond_bend_pairs = sorted(
+        {
+            (i, j)
+            for j, bend in enumerate(bend_inds)
+            for atom in bend
+            for i in atom_bonds.get(atom, ())
+        }
+    )
+
+    for i, j in bond_bend_pairs:
+        bond, bend = bond_inds[i], bend_inds[j]
+        from_, to_ = bond
+        # Skip bonds that are part of the bend
+        if (from_ in bend) and (to_ in bend):
             continue
+        intersecting_atom, terminal = (from_, to_) if from_ in bend else (to_, from_)
+        central = bend[1]
 
         # TODO: check collinearity of bond and bend.
 
         # When the common atom between bond and bend is a terminal, and not a central atom
         # in the bend we create a proper dihedral. Improper dihedrals are only created
         # when no proper dihedrals have been found.
-        if central not in bond_set:
-            # The new terminal atom in the dihedral is the one, that doesn' intersect.
-            terminal = tuple(bond_set - intersect)[0]
-            intersecting_atom = tuple(intersect)[0]
-            bend_terminal = tuple(bend_set - {central} - intersect)[0]
+        if intersecting_atom != central:
+            bend_terminal = bend[2] if intersecting_atom == bend[0] else bend[0]
 
             bend_rad = Bend._calculate(coords3d, bend)
             # Bend atoms are nearly collinear. Check if we can skip the central bend atom
             # and use an atom that is conneced to the terminal atom of the bend or bond.
             if bend_rad >= max_rad:
+                bend_set = set(bend)
+                bond_set = {intersecting_atom, terminal}
                 bend_terminal_bonds = set(bond_dict[bend_terminal]) - bend_set
                 bond_terminal_bonds = set(bond_dict[terminal]) - bond_set
                 set_dihedrals = [
@@ -567,15 +623,14 @@ def get_dihedral_inds(coords3d, bond_inds, bend_inds, max_deg, logger=None):
                             for botb_v2 in bond_terminal_bonds_v2
                         ]
             elif intersecting_atom == bend[0]:
-                set_dihedrals = [[terminal] + list(bend)]
+                set_dihedrals = [(terminal, *bend)]
             else:
-                set_dihedrals = [list(bend) + [terminal]]
+                set_dihedrals = [(*bend, terminal)]
             [set_dihedral_index(dihed) for dihed in set_dihedrals]
         # If the common atom is the central atom we try to form an out
         # of plane bend / improper torsion. They may be created later on.
         else:
-            fourth_atom = list(bond_set - intersect)
-            dihedral_ind = list(bend) + fourth_atom
+            dihedral_ind = [*bend, terminal]
             # This way dihedrals may be generated that contain linear
             # atoms and these would be undefinied. So we check for this.
             if dihedral_valid(coords3d, dihedral_ind, deg_thresh=max_deg):
@@ -1,19 +1,26 @@
-import numpy as np
+from math import cos, radians
 
 from pysisyphus.helpers_pure import log
 from pysisyphus.intcoords.PrimTypes import PrimTypes
-from pysisyphus.intcoords import Bend
 from pysisyphus.linalg import norm3
 
 
 def bend_valid(coords3d, indices, min_deg, max_deg):
-    val = Bend._calculate(coords3d, indices)
-    deg = np.rad2deg(val)
-    return min_deg <= deg <= max_deg
+    m, o, n = indices
+    u = coords3d[m] - coords3d[o]
+    v = coords3d[n] - coords3d[o]
+    # The cosine decreases monotonically on [0°, 180°], so the bend can be
+    # checked directly on the dot product, without calling arccos.
+    cos_bend = u.dot(v) / (norm3(u) * norm3(v))
+    if cos_bend > 1.0:
+        cos_bend = 1.0
+    elif cos_bend < -1.0:
+        cos_bend = -1.0
+    return cos(radians(max_deg)) <= cos_bend <= cos(radians(min_deg))
 
 
 def are_collinear(vec1, vec2, deg_thresh=179.5):
-    thresh = np.cos(np.deg2rad(deg_thresh))
+    thresh = cos(radians(deg_thresh))
     return abs(vec1.dot(vec2)) >= abs(thresh)
 
 
@@ -6,7 +6,7 @@ import numpy as np
 class NormalMode:
     """See http://gaussian.com/vib/"""
 
-    def __init__(self, l, masses):
+    def __init__(self, l, masses, msqrt=None):
         """NormalMode class.
 
         Cartesian displacements are normalized to 1.
@@ -17,11 +17,15 @@ class NormalMode:
             Cartesian, non-mass-weighted displacements.
         masses : np.array
             Atomic masses.
+        msqrt : np.array, optional
+            Square roots of the atomic masses. Can be supplied when many modes
+            share the same masses, otherwise they are calculated when needed.
         """
 
         self.l = np.array(l.flatten())
         self.l /= np.linalg.norm(l)
         self.masses = masses
+        self._msqrt = msqrt
         assert self.l.shape == self.masses.shape
 
     def __len__(self):
@@ -34,7 +38,13 @@ class NormalMode:
     def mw_norm_for_norm(self, norm=0.01):
         return norm * sqrt(self.red_mass)
 
+    @property
+    def msqrt(self):
+        if self._msqrt is None:
+            self._msqrt = np.sqrt(self.masses)
+        return self._msqrt
+
     @property
     def l_mw(self):
-        l_mw = self.l * np.sqrt(self.masses)
+        l_mw = self.l * self.msqrt
         return l_mw / np.linalg.norm(l_mw)
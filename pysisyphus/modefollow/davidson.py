@@ -4,12 +4,14 @@
 
 
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 import sys
 
 import numpy as np
+from scipy.linalg import eigh
 
 from pysisyphus.helpers_pure import eigval_to_wavenumber
-from pysisyphus.Geometry import get_trans_rot_projector
+from pysisyphus.Geometry import get_trans_rot_vectors
 from pysisyphus.modefollow.NormalMode import NormalMode
 from pysisyphus.TablePrinter import TablePrinter
 
@@ -20,13 +22,56 @@ DavidsonResult = namedtuple(
 )
 
 
-def forces_fin_diff(forces_getter, coords, b, step_size):
+def forces_fin_diff(forces_getter, coords, b, step_size, out=None):
     plus = forces_getter(coords + b)
     minus = forces_getter(coords - b)
-    fd = (minus - plus) / (2 * step_size)
+    fd = np.subtract(minus, plus, out=out)
+    fd /= 2 * step_size
     return fd
 
 
+def shifted_pinv_dot(eigvals, eigvecs, shift, vec, rcond=1e-8):
+    """Pseudo inverse of (M - shift * I) applied to vec.
+
+    M is given by its eigenvalues and orthonormal eigenvectors. When the
+    eigenvectors don't span the full space, M is zero on the orthogonal
+    complement. Small singular values are discarded as in np.linalg.pinv.
+
+    Multiple vectors can be treated at once, by supplying an array of shifts
+    and the vectors as columns of a 2D array."""
+    shift = np.asarray(shift, dtype=float)
+    shifted = np.subtract.outer(eigvals, shift)
+    abs_shifted = np.abs(shifted)
+    has_complement = eigvecs.shape[1] < eigvecs.shape[0]
+    max_abs = abs_shifted.max(axis=0)
+    if has_complement:
+        max_abs = np.maximum(max_abs, np.abs(shift))
+    cutoff = rcond * max_abs
+    inv_shifted = np.divide(
+        1.0, shifted, out=np.zeros_like(shifted), where=abs_shifted > cutoff
+    )
+    proj = eigvecs.T @ vec
+    result = eigvecs @ (inv_shifted * proj)
+    if has_complement:
+        inv_shift = np.divide(
+            1.0, shift, out=np.zeros_like(shift), where=np.abs(shift) > cutoff
+        )
+        result -= (vec - eigvecs @ proj) * inv_shift
+    return result
+
+
+def shifted_diag_dot(diag, shift, vec, eps=1e-8):
+    """Inverse of the shifted diagonal (diag - shift) applied to vec.
+
+    This is the preconditioner of Davidson's original method. Denominators
+    smaller than eps are capped. As for shifted_pinv_dot, multiple vectors
+    can be treated at once."""
+    denom = np.subtract.outer(diag, shift)
+    small = np.abs(denom) < eps
+    denom[small] = np.copysign(eps, denom[small])
+    return vec / denom
+
+
 def block_davidson(
     cart_coords,
     masses,
@@ -38,21 +83,72 @@ def block_davidson(
     max_cycles=25,
     res_rms_thresh=1e-4,
     start_precon=5,
+    precon_mode="full",
     remove_trans_rot=True,
     print_level=1,
+    n_workers=1,
+    storage_dtype=np.float64,
 ):
+    """Block Davidson method to determine selected normal modes.
+
+    With n_workers > 1 the finite differences of the different modes are
+    carried out concurrently in a thread pool. This requires a thread-safe
+    forces_getter.
+
+    A supplied hessian_precon is diagonalized only once (or reduced to its
+    diagonal with precon_mode="diag"). The shifted preconditioners of all roots
+    in all cycles are then applied without any further factorization.
+
+    The basis vectors, their Hessian actions and the derived approximate modes
+    and residues are stored with storage_dtype. np.float32 halves the memory
+    traffic of the large matrix products, while the small subspace Hessian is
+    always diagonalized in double precision."""
+    assert precon_mode in ("full", "diag")
+    full_precon = precon_mode == "full"
     num = len(guess_modes)
-    B_full = np.zeros((len(guess_modes[0]), num * max_cycles))
+    # With 'lowest' set, the new basis vectors of every cycle are derived from
+    # the 'lowest' roots, so later blocks may be smaller than the initial one.
+    assert (lowest is None) or (lowest <= num), "lowest must not exceed the guesses!"
+    B_full = np.zeros((len(guess_modes[0]), num * max_cycles), dtype=storage_dtype)
     S_full = np.zeros_like(B_full)
-    I = np.eye(cart_coords.size)
+    # Unsymmetrized projected Hessian B.T @ S, extended by the new rows and
+    # columns in every cycle.
+    BS_full = np.zeros((B_full.shape[1], B_full.shape[1]), dtype=np.float64)
+    # Buffers for approximate modes and residues, reused in every cycle
+    Bv_full = np.empty_like(B_full)
+    residues_full = np.empty_like(B_full)
     masses_rep = np.repeat(masses, 3)
     msqrt = np.sqrt(masses_rep)
+    inv_msqrt = 1 / msqrt
+
+    # The supplied preconditioner Hessian only has to be diagonalized once
+    if (hessian_precon is not None) and full_precon:
+        hessian_precon = np.linalg.eigh(hessian_precon)
+    elif hessian_precon is not None:
+        hessian_precon = np.diag(hessian_precon)
 
     # Projector to remove translation and rotation
-    P = get_trans_rot_projector(cart_coords, masses, full=True)
-    guess_modes = [
-        NormalMode(P.dot(mode.l_mw) / msqrt, masses_rep) for mode in guess_modes
-    ]
+    #
+    # The projector I - T @ T.T is never built explicitly, as it is cheaper to
+    # apply it using the orthonormal translation/rotation vectors T.
+    T = get_trans_rot_vectors(cart_coords, masses).T
+
+    def project(vecs):
+        # In place, so no new arrays are allocated in the cycles
+        vecs -= T @ (T.T @ vecs)
+        return vecs
+
+    guess_mw = project(np.array([mode.l_mw for mode in guess_modes]).T)
+    guess_mw /= np.linalg.norm(guess_mw, axis=0)
+    # Start from an orthonormal basis, so new basis vectors only have to be
+    # orthogonalized against the present ones.
+    Q, R = np.linalg.qr(guess_mw)
+    guess_modes = [NormalMode(b_ * inv_msqrt, masses_rep, msqrt) for b_ in Q.T]
+    B_full[:, :num] = Q
+    # Roots are followed by their overlaps with the (projected) guess modes.
+    # As all followed roots lie in the span of the orthonormal basis B, they
+    # are tracked by their coefficients in B. Initially these are given by R.
+    c_prev = R
 
     col_fmts = "int int int float_short float str".split()
     header = ("#", "subspace size", "mode", "ṽ / cm⁻¹", "rms(r)", "Conv")
@@ -61,95 +157,143 @@ def block_davidson(
     if print_level == 1:
         table.print_header()
 
-    b_prev = np.array([mode.l_mw for mode in guess_modes]).T
+    # First free column in B_full
+    to_ = 0
     for i in range(max_cycles):
-        # Add new basis vectors to B matrix
-        b = np.array([mode.l_mw for mode in guess_modes]).T
-        from_ = i * num
-        to_ = (i + 1) * num
-        B_full[:, from_:to_] = b
+        # The new basis vectors were already stored in B_full
+        from_ = to_
+        to_ = from_ + len(guess_modes)
 
         # Estimate action of Hessian by finite differences.
-        for j in range(num):
+        def fin_diff(j):
             mode = guess_modes[j]
             # Get a step size in mass-weighted coordinates that results
             # in the desired 'trial_step_size' in not-mass-weighted coordinates.
             mw_step_size = mode.mw_norm_for_norm(trial_step_size)
             # Actual step in non-mass-weighted coordinates
             step = trial_step_size * mode.l
-            S_full[:, from_ + j] = (
-                # Convert to mass-weighted coordinates
-                forces_fin_diff(forces_getter, cart_coords, step, mw_step_size)
-                / msqrt
+            fd = forces_fin_diff(
+                forces_getter, cart_coords, step, mw_step_size, out=S_full[:, from_ + j]
             )
+            # Convert to mass-weighted coordinates
+            fd *= inv_msqrt
+
+        if n_workers > 1:
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                list(executor.map(fin_diff, range(len(guess_modes))))
+        else:
+            for j in range(len(guess_modes)):
+                fin_diff(j)
 
         # Views on columns that are actually set
         B = B_full[:, :to_]
         S = S_full[:, :to_]
 
-        # Calculate and symmetrize approximate hessian
-        Hm = B.T.dot(S)
+        # Calculate and symmetrize approximate hessian. Only the entries
+        # involving the new basis vectors have to be calculated.
+        BS_full[:to_, from_:to_] = B.T @ S[:, from_:to_]
+        BS_full[from_:to_, :from_] = B[:, from_:to_].T @ S[:, :from_]
+        Hm = BS_full[:to_, :to_]
         Hm = (Hm + Hm.T) / 2
-        # Diagonalize small Hessian
-        w, v = np.linalg.eigh(Hm)
+        # Diagonalize small Hessian. All eigenpairs are needed to calculate the
+        # residues. Hm is a fresh array, so it may be overwritten.
+        w, v = eigh(Hm, driver="evd", overwrite_a=True, check_finite=False)
+        # Avoid upcasting B and S in the matrix products below
+        v_stored = v.astype(storage_dtype, copy=False)
 
-        # Approximations to exact eigenvectors in current cycle
-        approx_modes = (v * B[:, :, None]).sum(axis=1).T
         # Calculate overlaps between previous root and the new approximate
         # normal modes for root following.
         if lowest is None:
-            # 2D overlap array. approx_modes in row, b_prev in columns.
-            overlaps = np.einsum("ij,jk->ik", approx_modes, b_prev)
+            # 2D overlap array. Approximate modes in row, previous roots in
+            # columns. The overlaps are calculated in the subspace, as the previous
+            # roots only have non-zero coefficients for the older basis vectors.
+            overlaps = v[: len(c_prev)].T @ c_prev
             mode_inds = np.abs(overlaps).argmax(axis=0)
         else:
             mode_inds = np.arange(lowest)
-        b_prev = approx_modes[mode_inds].T
+        c_prev = v[:, mode_inds]
+
+        # Approximate modes and residues (Eq. (7) in [1]) of the selected roots.
+        # These suffice to check convergence and to construct new basis vectors.
+        v_sel = v_stored[:, mode_inds]
+        Bv_sel = B @ v_sel
+        residues_sel = S @ v_sel
+        residues_sel -= Bv_sel * w[mode_inds]
 
-        # Eq. (7) in [1]
-        residues = (v * (S[:, :, None] - w * B[:, :, None])).sum(axis=1)
+        # Check convergence criteria
+        #
+        # Convergence is signalled using only the roots we are actually interested
+        # in.
+        sqrt_size = np.sqrt(B.shape[0])
+        tracked_rms = np.linalg.norm(residues_sel, axis=0) / sqrt_size
+        tracked_converged = tracked_rms < res_rms_thresh
+        modes_converged = all(tracked_converged)
+        last_cycle = modes_converged or (i == max_cycles - 1)
+        # Reconstruct Hessian B @ Hm @ B.T, but only start after some cycles.
+        ritz_precon = (hessian_precon is None) and (i >= start_precon)
+
+        # All approximate modes are only needed for the preconditioner and for
+        # the result; all residues only for detailed printing and the result.
+        if ritz_precon or (print_level == 2) or last_cycle:
+            Bv = np.matmul(B, v_stored, out=Bv_full[:, :to_])
+            approx_modes = Bv.T
+        if (print_level == 2) or last_cycle:
+            residues = np.matmul(S, v_stored, out=residues_full[:, :to_])
+            residues -= Bv * w
+            res_rms = np.linalg.norm(residues, axis=0) / sqrt_size
 
-        # Determine preconditioner matrix
+        # Determine eigensystem, or only the diagonal, of the preconditioner
+        # matrix.
         #
         # Use supplied matrix
         if hessian_precon is not None:
-            precon_mat = hessian_precon
-        # Reconstruct Hessian, but only start after some cycles
-        elif i >= start_precon:
-            precon_mat = B.dot(Hm).dot(B.T)
+            precon = hessian_precon
+        # As B is orthonormal the eigensystem of the reconstructed Hessian is
+        # given by the Ritz pairs.
+        elif ritz_precon and full_precon:
+            precon = (w, Bv)
+        elif ritz_precon:
+            precon = Bv**2 @ w
         # No preconditioning if no matrix was supplied or we are in an early cycle.
         else:
-            precon_mat = None
-
-        # Construct new basis vector from residuum of selected mode
-        b = np.zeros_like(b_prev)
-        for j, mode_ind in enumerate(mode_inds):
-            r = residues[:, mode_ind]
-            if precon_mat is not None:
-                # Construct actual preconditioner X
-                X = np.linalg.pinv(precon_mat - w[mode_ind] * I, rcond=1e-8)
-                b[:, j] = X.dot(r)
+            precon = None
+
+        # Construct new basis vectors from the residues of the selected modes
+        b = residues_sel
+        # Apply actual preconditioner pinv(precon_mat - w * I) to all residues
+        # at once.
+        if precon is not None:
+            shifts = w[mode_inds]
+            if full_precon:
+                b = shifted_pinv_dot(*precon, shifts, b)
             else:
-                b[:, j] = r
+                b = shifted_diag_dot(precon, shifts, b)
 
-        # Project out translation and rotation from new mode guess
-        if remove_trans_rot:
-            b = P.dot(b)
-        # Orthogonalize new vectors against preset vectors
-        b = np.linalg.qr(np.concatenate((B, b), axis=1))[0][:, -num:]
+        b = b.astype(storage_dtype, copy=False)
+        # Orthogonalize new vectors against the orthonormal present vectors. As
+        # these are already free of translation and rotation, both are projected
+        # out of the new vectors in the same Gram-Schmidt passes, which are
+        # carried out twice for numerical stability.
+        for _ in range(2):
+            if remove_trans_rot:
+                project(b)
+            b -= B @ (B.T @ b)
+        b = np.linalg.qr(b)[0]
+        # Store the orthonormalized vectors directly as basis vectors of the
+        # next cycle, instead of recovering them from the normal modes.
+        if to_ + b.shape[1] <= B_full.shape[1]:
+            B_full[:, to_ : to_ + b.shape[1]] = b
 
         # New NormalMode from non-mass-weighted displacements
-        guess_modes = [NormalMode(b_ / msqrt, masses_rep) for b_ in b.T]
+        guess_modes = [NormalMode(b_ * inv_msqrt, masses_rep, msqrt) for b_ in b.T]
 
         # Calculate wavenumbers
         nus = eigval_to_wavenumber(w)
 
-        # Check convergence criteria
-        max_res = np.abs(residues).max(axis=0)
-        res_rms = np.sqrt(np.mean(residues ** 2, axis=0))
-
-        converged = res_rms < res_rms_thresh
         # Print progress if requested
         if print_level == 2:
+            converged = res_rms < res_rms_thresh
+            max_res = np.abs(residues).max(axis=0)
             print(f"Cycle {i:02d}")
             print("\t #  |    ṽ / cm⁻¹|   rms(r)   | max(|r|) ")
             print("\t------------------------------------------")
@@ -161,12 +305,10 @@ def block_davidson(
                 )
             print()
         elif print_level == 1:
-            for j in mode_inds:
-                conv_str = "✓" if converged[j] else "✗"
-                table.print_row((i, B.shape[1], j, nus[j], res_rms[j], conv_str))
+            for j, rms, conv in zip(mode_inds, tracked_rms, tracked_converged):
+                conv_str = "✓" if conv else "✗"
+                table.print_row((i, B.shape[1], j, nus[j], rms, conv_str))
 
-        # Convergence is signalled using only the roots we are actually interested in
-        modes_converged = all(converged[mode_inds])
         if modes_converged:
             if print_level > 0:
                 print(f"\tDavidson procedure converged in {i+1} cycles!")
@@ -1,7 +1,9 @@
 import argparse
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 import copy
 import datetime
+import fnmatch
 import itertools as it
 import os
 from math import modf
@@ -186,6 +188,18 @@ def parse_args(args):
     return parser.parse_args()
 
 
+def copy_containers(obj):
+    """Copy nested dicts and lists, but share all other objects.
+
+    Cheaper than copy.deepcopy(), while still protecting the calculator input
+    parsed from YAML from being modified by the calculators."""
+    if isinstance(obj, dict):
+        return {key: copy_containers(val) for key, val in obj.items()}
+    elif isinstance(obj, list):
+        return [copy_containers(item) for item in obj]
+    return obj
+
+
 def get_calc_closure(base_name, calc_key, calc_kwargs, iter_dict=None, index=None):
     if iter_dict is None:
         iter_dict = dict()
@@ -203,27 +217,34 @@ def get_calc_closure(base_name, calc_key, calc_kwargs, iter_dict=None, index=Non
         "calc2": "calculator2",  # shortcut for 'calculator2'
     }
 
+    # Some calculators are just wrappers, modifying forces from actual calculators,
+    # e.g. AFIR and Dimer. If we find one of the keys in 'calc_map' in 'calc_kwargs'
+    # we create the actual calculator and assign it to the corresponding value in
+    # 'calc_map'. The getters of the actual calculators are only set up once.
+    actual_getters = dict()
+    for key, val in calc_map.items():
+        if key in calc_kwargs:
+            # Use different base_name to distinguish the calculator(s)
+            actual_base_name = val
+            actual_kwargs = copy_containers(calc_kwargs[key])
+            actual_key = actual_kwargs.pop("type")
+            # Pass 'index' to arguments, to avoid recreating calculators with
+            # the same name. As both getters are called together, their indices
+            # stay in sync.
+            actual_getters[val] = get_calc_closure(
+                actual_base_name, actual_key, actual_kwargs, index=index
+            )
+    static_kwargs = {
+        key: val for key, val in calc_kwargs.items() if key not in calc_map
+    }
+    calc_cls = CALC_DICT[calc_key]
+
     def calc_getter(**add_kwargs):
         nonlocal index
 
-        kwargs_copy = copy.deepcopy(calc_kwargs)
-
-        # Some calculators are just wrappers, modifying forces from actual calculators,
-        # e.g. AFIR and Dimer. If we find one of the keys in 'calc_map' in 'calc_kwargs'
-        # we create the actual calculator and assign it to the corresponding value in
-        # 'calc_map'.
-        for key, val in calc_map.items():
-            if key in kwargs_copy:
-                # Use different base_name to distinguish the calculator(s)
-                actual_base_name = val
-                actual_kwargs = kwargs_copy.pop(key)
-                actual_key = actual_kwargs.pop("type")
-                # Pass 'index' to arguments, to avoid recreating calculators with
-                # the same name.
-                actual_calc = get_calc_closure(
-                    actual_base_name, actual_key, actual_kwargs, index=index
-                )()
-                kwargs_copy[val] = actual_calc
+        kwargs_copy = copy_containers(static_kwargs)
+        for val, actual_getter in actual_getters.items():
+            kwargs_copy[val] = actual_getter()
 
         kwargs_copy["base_name"] = base_name
         kwargs_copy.update(add_kwargs)
@@ -231,7 +252,7 @@ def get_calc_closure(base_name, calc_key, calc_kwargs, iter_dict=None, index=Non
         for key, iter_ in iter_dict.items():
             kwargs_copy[key] = next(iter_)
         index += 1
-        return CALC_DICT[calc_key](**kwargs_copy)
+        return calc_cls(**kwargs_copy)
 
     return calc_getter
 
@@ -520,6 +541,9 @@ def run_calculations(
     scheduler=None,
     assert_track=False,
     run_func=None,
+    overlap_dumps=False,
+    batch_size=1,
+    release_calcs=False,
 ):
     print(highlight_text("Running calculations"))
 
@@ -528,27 +552,55 @@ def run_calculations(
     def par_calc(geom):
         return getattr(geom.calculator, func_name)(geom.atoms, geom.coords)
 
-    for geom in geoms:
-        geom.set_calculator(calc_getter())
+    def par_calc_batch(batch):
+        return [par_calc(geom) for geom in batch]
 
-    if assert_track:
-        assert all(
-            [geom.calculator.track for geom in geoms]
-        ), "'track: True' must be present in calc section."
+    def set_calculators(geoms_):
+        for geom in geoms_:
+            geom.set_calculator(calc_getter())
+
+        if assert_track:
+            assert all(
+                [geom.calculator.track for geom in geoms_]
+            ), "'track: True' must be present in calc section."
 
     if scheduler:
+        set_calculators(geoms)
         client = Client(scheduler, pure=False, silence_logs=False)
-        results_futures = client.map(par_calc, geoms)
-        all_results = client.gather(results_futures)
+        # Geometries can be submitted in batches, to save scheduler roundtrips
+        # when there are many cheap calculations. By default every geometry is
+        # submitted on its own, which balances the load best.
+        batch_size = max(batch_size, 1)
+        batches = [geoms[i : i + batch_size] for i in range(0, len(geoms), batch_size)]
+        results_futures = client.map(par_calc_batch, batches, pure=False)
+        all_results = list(it.chain(*client.gather(results_futures)))
     else:
-        all_results = list()
         i_fmt = "02d"
-        for i, geom in enumerate(geoms):
+
+        def run_calc(i):
+            geom = geoms[i]
             print(highlight_text(f"Calculation {i:{i_fmt}}", level=1))
 
             start = time.time()
             print(geom)
             results = getattr(geom.calculator, func_name)(geom.atoms, geom.cart_coords)
+            end = time.time()
+            diff = end - start
+            print(f"Calculation took {diff:.1f} s.\n")
+            sys.stdout.flush()
+            return results
+
+        def set_next_chkfiles(i):
+            try:
+                cur_calculator = geoms[i].calculator
+                next_calculator = geoms[i + 1].calculator
+                next_calculator.set_chkfiles(cur_calculator.get_chkfiles())
+                msg = f"Set chkfiles of calculator {i:{i_fmt}} on calculator {i+1:{i_fmt}}"
+            except AttributeError:
+                msg = "Calculator does not support set/get_chkfiles!"
+            print(msg)
+
+        def dump_results(geom, results):
             # results dict of MultiCalc will contain keys that can be dumped yet. So
             # we skip the JSON dumping when KeyError is raised.
             try:
@@ -578,20 +630,31 @@ def run_calculations(
                 )
                 print(f"Dumped hessian to '{hfn}'.")
 
-            all_results.append(results)
-            if i < (len(geoms) - 1):
-                try:
-                    cur_calculator = geom.calculator
-                    next_calculator = geoms[i + 1].calculator
-                    next_calculator.set_chkfiles(cur_calculator.get_chkfiles())
-                    msg = f"Set chkfiles of calculator {i:{i_fmt}} on calculator {i+1:{i_fmt}}"
-                except AttributeError:
-                    msg = "Calculator does not support set/get_chkfiles!"
-                print(msg)
-            end = time.time()
-            diff = end - start
-            print(f"Calculation took {diff:.1f} s.\n")
-            sys.stdout.flush()
+        # The next calculation only depends on the chkfiles of the current one.
+        # When requested it is already started in a background thread, while
+        # the results of the current calculation are dumped.
+        #
+        # Calculators are only created right before they are needed. With
+        # 'release_calcs' they are also dropped as soon as their results are
+        # dumped, so only two calculators are alive at any time.
+        all_results = list()
+        next_results = None
+        set_calculators(geoms[:1])
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            for i, geom in enumerate(geoms):
+                if next_results is None:
+                    results = run_calc(i)
+                else:
+                    results = next_results.result()
+                if i < (len(geoms) - 1):
+                    set_calculators(geoms[i + 1 : i + 2])
+                    set_next_chkfiles(i)
+                    if overlap_dumps:
+                        next_results = executor.submit(run_calc, i + 1)
+                dump_results(geom, results)
+                all_results.append(results)
+                if release_calcs:
+                    geom.set_calculator(None, clear=False)
     print()
 
     for geom, results in zip(geoms, all_results):
@@ -1235,14 +1298,16 @@ def get_defaults(conf_dict, T_default=T_DEFAULT, p_default=p_DEFAULT):
     return dd
 
 
-def get_last_calc_cycle():
-    def keyfunc(path):
-        return re.match(r"image_\d+.(\d+).out", str(path))[1]
+CALC_LOG_RE = re.compile(r"image_\d+\.(\d+)\.out")
 
+
+def get_last_calc_cycle():
     cwd = Path(".")
-    calc_logs = [str(cl) for cl in cwd.glob("image_*.*.out")]
-    calc_logs = sorted(calc_logs, key=keyfunc)
-    grouped = it.groupby(calc_logs, key=keyfunc)
+    # Determine the calculation cycle of every log only once
+    calc_cycles = sorted(
+        int(CALC_LOG_RE.match(str(cl))[1]) for cl in cwd.glob("image_*.*.out")
+    )
+    grouped = it.groupby(calc_cycles)
     # Find the last completly finished cycle.
     last_length = 0
     last_calc_cycle = 0
@@ -1253,7 +1318,7 @@ def get_last_calc_cycle():
             # items than last one, that is an unfinished cycle.
             break
         last_length = cycle_length
-        last_calc_cycle = int(calc_cycle)
+        last_calc_cycle = calc_cycle
     if last_calc_cycle == 0:
         print("Can't find any old calculator logs.")
     print(f"Last calculation counter is {last_calc_cycle}.")
@@ -1373,6 +1438,12 @@ def main(run_dict, restart=False, yaml_dir="./", scheduler=None):
     calc_key = run_dict["calc"].pop("type")
     calc_kwargs = run_dict["calc"]
     calc_run_func = calc_kwargs.pop("run_func", None)
+    # Options for run_calculations, that are not passed to the calculator
+    calc_run_kwargs = {
+        key: calc_kwargs.pop(key)
+        for key in ("overlap_dumps", "batch_size", "release_calcs")
+        if key in calc_kwargs
+    }
     calc_kwargs["out_dir"] = calc_kwargs.get("out_dir", yaml_dir / OUT_DIR_DEFAULT)
     calc_base_name = calc_kwargs.get("base_name", "calculator")
     if calc_key in ("oniom", "ext"):
@@ -1465,7 +1536,7 @@ def main(run_dict, restart=False, yaml_dir="./", scheduler=None):
             cos_cls, type(FreezingString)
         ):
             cos_kwargs["calc_getter"] = get_calc_closure("image", calc_key, calc_kwargs)
-        geom = COS_DICT[cos_key](geoms, **cos_kwargs)
+        geom = cos_cls(geoms, **cos_kwargs)
     elif len(geoms) == 1:
         geom = geoms[0]
 
@@ -1665,7 +1736,7 @@ def main(run_dict, restart=False, yaml_dir="./", scheduler=None):
     # Fallback when no specific job type was specified
     else:
         calced_geoms, calced_results = run_calculations(
-            geoms, calc_getter, scheduler, run_func=calc_run_func
+            geoms, calc_getter, scheduler, run_func=calc_run_func, **calc_run_kwargs
         )
 
     # We can't use locals() in the dict comprehension, as it runs in its own
@@ -1697,153 +1768,160 @@ def check_asserts(results, run_dict):
     print()
 
 
+CLEAN_GLOBS = (
+    "cycle*.trj",
+    "interpolated.trj",
+    "interpolated.image*.xyz",
+    "calculator.log",
+    "optimizer.log",
+    "tsoptimizer.log",
+    "wfoverlap.log",
+    "host_*.calculator.log",
+    "host_*.wfoverlap.log",
+    "wfo_*.out",
+    "optimization.trj",
+    "cos.log",
+    "*.gradient",
+    "optimizer_results.yaml",
+    # ORCA specific
+    "*.orca.gbw",
+    "*.orca.cis",
+    "*.orca.engrad",
+    "*.orca.hessian",
+    "*.orca.inp",
+    "*.orca.hess",
+    "*.orca.molden",
+    # OpenMOLCAS specific
+    "calculator*.out",
+    "calculator*.JobIph",
+    "calculator*.RasOrb",
+    "*rasscf.molden",
+    # Turbomole specific
+    "calculator_*.control",
+    "calculator_*.coord",
+    "calculator_*.mos",
+    "calculator_*.ciss_a",
+    "calculator*.sing_a",
+    "*wavefunction.molden",
+    "*input.xyz",
+    "*.coord",
+    # PySCF specific
+    "calculator*.chkfile",
+    "*.pyscf.out",
+    "*.chkfile",
+    # WFOverlap specific
+    "wfo_*.*.out",
+    # XTB specific
+    "image*.grad",
+    "calculator*.grad",
+    "calculator*.xcontrol",
+    "calculator*.charges",
+    "image_*",
+    "splined_ts_guess.xyz",
+    "splined_hei_tangent",
+    "cart_hei_tangent.trj",
+    "dimer_ts.xyz",
+    "dimer_pickle",
+    "interpolated.geom_*.xyz",
+    # Wavefunction overlap
+    "wfo_*",
+    "image*.molden",
+    "jmol.spt",
+    "overlap_data.h5",
+    "*_CDD.png",
+    "*_CDD.cub",
+    "internal_coords.log",
+    "hei_tangent",
+    "optimization.trj",
+    "splined_hei.xyz",
+    "ts_opt.xyz",
+    "final_geometry.xyz",
+    "calculated_init_hessian",
+    "cur_out",
+    # HDF5 files
+    "optimization.h5",
+    "afir.h5",
+    # Optimization files
+    "*_optimization.trj",
+    # Preopt files
+    "first_*",
+    "last_*",
+    # TSOpt
+    "rsirfo*",
+    # IRC files
+    "irc_*",
+    "irc.log",
+    "finished_*",
+    # IRC/Endopt files
+    "backward_*",
+    "forward_*",
+    # Misc
+    "*imaginary_mode_*.trj",
+    "cart_hei_tangent",
+    "ts_calculated_init_cart_hessian",
+    "calculated_final_cart_hessian",
+    "*final_geometry.xyz",
+    "*final_geometries.trj",
+    "current_geometry.xyz",
+    "*current_geometries.trj",
+    "hess_calc_cyc*.h5",
+    "ts_hess_calc_cyc*.h5",
+    "hess_init_irc.h5",
+    "final_hessian.h5",
+    "ts_current_geometry.xyz",
+    "dimer_*",
+    "plain_hei_tangent",
+    "plain_hei.xyz",
+    "hess_calc_irc*.h5",
+    "rebuilt_primitives.xyz",
+    "RUN.yaml",
+    "middle_for_preopt.trj",
+    "relaxed_scan.trj",
+    "too_similar.trj",
+    # MDP
+    "mdp_ee_ascent.trj",
+    "mdp_ee_fin_*.trj",
+    "mdp_ee_init_*.trj",
+    "aligned.geom*xyz",
+    "cos_hei.trj",
+    # Dimer
+    "calculator_*.N",
+    "calculator_*.N.trj",
+    "dimer.log",
+    "*.gfnff_topo",
+    # DFTB+
+    "*.detailed.out",
+    "*.geometry.gen",
+    "*.dftb_in.hsd",
+    "*.EXC.DAT",
+    "*.XplusY.DAT",
+    "*.dftb.out",
+    "rsprfo_*",
+    "reparametrized.trj",
+    "end_geoms_and_ts.trj",
+    "left_ts_right_geoms.trj",
+    "ts_final_hessian.h5",
+    "third_deriv.h5",
+    "*.ao_ovlp_rec",
+    # Gaussian MO guess
+    "*.guess.chk",
+    # MOPAC
+    "*.mopac.aux",
+    "*.mopac.arc",
+    "*.mopac.mop",
+    "*.mopac.out",
+)
+# All globs combined into one regex, so the cwd is only scanned once
+CLEAN_RE = re.compile("|".join(fnmatch.translate(glob) for glob in CLEAN_GLOBS))
+
+
 def do_clean(force=False):
     """Deletes files from previous runs in the cwd.
     A similar function could be used to store everything ..."""
     cwd = Path(".").resolve()
-    rm_globs = (
-        "cycle*.trj",
-        "interpolated.trj",
-        "interpolated.image*.xyz",
-        "calculator.log",
-        "optimizer.log",
-        "tsoptimizer.log",
-        "wfoverlap.log",
-        "host_*.calculator.log",
-        "host_*.wfoverlap.log",
-        "wfo_*.out" "optimization.trj",
-        "cos.log",
-        "*.gradient",
-        "optimizer_results.yaml",
-        # ORCA specific
-        "*.orca.gbw",
-        "*.orca.cis",
-        "*.orca.engrad",
-        "*.orca.hessian",
-        "*.orca.inp",
-        "*.orca.hess",
-        "*.orca.molden",
-        # OpenMOLCAS specific
-        "calculator*.out",
-        "calculator*.JobIph",
-        "calculator*.RasOrb",
-        "*rasscf.molden",
-        # Turbomole specific
-        "calculator_*.control",
-        "calculator_*.coord",
-        "calculator_*.mos",
-        "calculator_*.ciss_a",
-        "calculator*.sing_a",
-        "*wavefunction.molden",
-        "*input.xyz",
-        "*.coord",
-        # PySCF specific
-        "calculator*.chkfile",
-        "*.pyscf.out",
-        "*.chkfile",
-        # WFOverlap specific
-        "wfo_*.*.out",
-        # XTB specific
-        "image*.grad",
-        "calculator*.grad",
-        "calculator*.xcontrol",
-        "calculator*.charges",
-        "image_*",
-        "splined_ts_guess.xyz",
-        "splined_hei_tangent",
-        "cart_hei_tangent.trj",
-        "dimer_ts.xyz",
-        "dimer_pickle",
-        "interpolated.geom_*.xyz",
-        # Wavefunction overlap
-        "wfo_*",
-        "image*.molden",
-        "jmol.spt",
-        "overlap_data.h5",
-        "*_CDD.png",
-        "*_CDD.cub",
-        "internal_coords.log",
-        "hei_tangent",
-        "optimization.trj",
-        "splined_hei.xyz",
-        "ts_opt.xyz",
-        "final_geometry.xyz",
-        "calculated_init_hessian",
-        "cur_out",
-        # HDF5 files
-        "optimization.h5",
-        "afir.h5",
-        # Optimization files
-        "*_optimization.trj",
-        # Preopt files
-        "first_*",
-        "last_*",
-        # TSOpt
-        "rsirfo*",
-        # IRC files
-        "irc_*",
-        "irc.log",
-        "finished_*",
-        # IRC/Endopt files
-        "backward_*",
-        "forward_*",
-        # Misc
-        "*imaginary_mode_*.trj",
-        "cart_hei_tangent",
-        "ts_calculated_init_cart_hessian",
-        "calculated_final_cart_hessian",
-        "*final_geometry.xyz",
-        "*final_geometries.trj",
-        "current_geometry.xyz",
-        "*current_geometries.trj",
-        "hess_calc_cyc*.h5",
-        "ts_hess_calc_cyc*.h5",
-        "hess_init_irc.h5",
-        "final_hessian.h5",
-        "ts_current_geometry.xyz",
-        "dimer_*",
-        "plain_hei_tangent",
-        "plain_hei.xyz",
-        "hess_calc_irc*.h5",
-        "rebuilt_primitives.xyz",
-        "RUN.yaml",
-        "middle_for_preopt.trj",
-        "relaxed_scan.trj",
-        "too_similar.trj",
-        # MDP
-        "mdp_ee_ascent.trj",
-        "mdp_ee_fin_*.trj",
-        "mdp_ee_init_*.trj",
-        "aligned.geom*xyz",
-        "cos_hei.trj",
-        # Dimer
-        "calculator_*.N",
-        "calculator_*.N.trj",
-        "dimer.log",
-        "*.gfnff_topo",
-        # DFTB+
-        "*.detailed.out",
-        "*.geometry.gen",
-        "*.dftb_in.hsd",
-        "*.EXC.DAT",
-        "*.XplusY.DAT",
-        "*.dftb.out",
-        "rsprfo_*",
-        "reparametrized.trj",
-        "end_geoms_and_ts.trj",
-        "left_ts_right_geoms.trj",
-        "ts_final_hessian.h5",
-        "third_deriv.h5",
-        "*.ao_ovlp_rec",
-        # MOPAC
-        "*.mopac.aux",
-        "*.mopac.arc",
-        "*.mopac.mop",
-        "*.mopac.out",
+    to_rm_paths = sorted(
+        Path(entry.path) for entry in os.scandir(cwd) if CLEAN_RE.match(entry.name)
     )
-    to_rm_paths = list()
-    for glob in rm_globs:
-        to_rm_paths.extend(list(cwd.glob(glob)))
     to_rm_strs = [str(p) for p in to_rm_paths]
     for s in to_rm_strs:
         print(s)
@@ -3,8 +3,10 @@ import struct
 import numpy as np
 
 
-NINE_ZEROS = struct.pack("d" * 9, *[0.0] * 9)
-EYE3 = struct.pack("d" * 9, *np.eye(3).flatten())
+# Precompiled struct for (inverse) cell vectors and the virial
+NINE_FLOATS = struct.Struct("d" * 9)
+NINE_ZEROS = NINE_FLOATS.pack(*[0.0] * 9)
+EYE3 = NINE_FLOATS.pack(*np.eye(3).flatten())
 
 
 def send_closure(sock, hdrlen, fmts, verbose=False):
@@ -21,9 +23,11 @@ def send_closure(sock, hdrlen, fmts, verbose=False):
         """
         if not packed:
             if fmt == "floats":
-                msg = struct.pack(fmts[fmt], *msg)
+                # Send the array buffer directly, without boxing all items
+                # into Python floats.
+                msg = np.ascontiguousarray(msg, dtype=float)
             elif fmt is not None:
-                msg = struct.pack(fmts[fmt], msg)
+                msg = fmts[fmt].pack(msg)
             else:
                 msg = f"{msg: <{hdrlen}}".encode("ascii")
         if verbose:
@@ -43,16 +47,18 @@ def recv_closure(sock, hdrlen, fmts, verbose=False):
 
         If nbytes is not given we expect hdrlen (header length) bytes.
         If fmt is given the message is also unpacked using struct, otherwise
-        ascii bytes are assumed and a string is returned.
+        ascii bytes are assumed and a string is returned. Float vectors and
+        matrices are received directly into a 1d float array.
         """
         if nbytes is None:
             nbytes = hdrlen
 
-        msg = sock.recv(nbytes)
-        if fmt:
-            msg = struct.unpack(fmts[fmt], msg)
+        if fmt in ("floats", "floats_sq"):
+            msg = recv_into_exact(sock, np.empty(nbytes // 8))
+        elif fmt:
+            msg = fmts[fmt].unpack(sock.recv(nbytes))
         else:
-            msg = msg.decode("ascii").strip()
+            msg = sock.recv(nbytes).decode("ascii").strip()
         if verbose:
             if expect:
                 expect = f", expected '{expect}'"
@@ -63,12 +69,46 @@ def recv_closure(sock, hdrlen, fmts, verbose=False):
     return recv_msg
 
 
-def get_fmts(cartesians):
+def recv_into_exact(sock, buf):
+    """Fill the writable buffer buf completely with bytes from the socket.
+
+    sock.recv_into may return less bytes than requested, so we keep
+    receiving until the buffer is full.
+    """
+    view = memoryview(buf).cast("B")
+    nbytes = view.nbytes
+    received = 0
+    while received < nbytes:
+        chunk = sock.recv_into(view[received:])
+        if chunk == 0:
+            raise ConnectionError("Socket connection closed unexpectedly.")
+        received += chunk
+    return buf
+
+
+def sendmsg_all(sock, buffers):
+    """Send several buffers with as few sendmsg calls as possible.
+
+    Like sock.sendall, sock.sendmsg may only send parts of the data, so
+    we keep sending whatever is left.
+    """
+    views = [memoryview(buf).cast("B") for buf in buffers]
+    while views:
+        sent = sock.sendmsg(views)
+        while views and sent >= views[0].nbytes:
+            sent -= views.pop(0).nbytes
+        if sent:
+            views[0] = views[0][sent:]
+
+
+def get_fmts():
+    """Precompiled structs, so the format strings are only parsed once.
+
+    Float vectors and matrices are sent and received as array buffers and
+    need no struct."""
     fmts = {
-        "int": "i",  # Atom number
-        "float": "d",  # Energy
-        "nine_floats": "d" * 9,  # (Inverse) cell vectors, virial, zeros
-        "floats": "d" * cartesians,  # Forces
-        "floats_sq": "d" * cartesians**2,  # Hessian
+        "int": struct.Struct("i"),  # Atom number
+        "float": struct.Struct("d"),  # Energy
+        "nine_floats": NINE_FLOATS,  # (Inverse) cell vectors, virial, zeros
     }
     return fmts
@@ -0,0 +1,163 @@
+"""Numba-compiled kernels to evaluate Cartesian Gaussian shells on grids.
+
+The kernels yield the same values as the generated functions in
+pysisyphus.wavefunction.ints.cart_gto3d, but the contraction over the primitive
+Gaussians is carried out in one loop and the results are written into a
+supplied array. cart_gto3d_basis evaluates a whole basis at all points of a
+grid in one call, in parallel over the points.
+
+Numba is an optional dependency. When it is not available HAS_NUMBA is False
+and Shells.eval falls back to a NumPy implementation.
+"""
+
+import math
+
+try:
+    from numba import njit, prange
+
+    HAS_NUMBA = True
+except ModuleNotFoundError:
+    HAS_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        def wrapper(func):
+            return func
+
+        return wrapper
+
+
+# Normalization factors of the Cartesian components
+_C2 = 0.5773502691896258
+_C3 = 0.2581988897471611
+_C4 = 0.09759000729485332
+_C4_1 = 0.3333333333333333
+_C4_2 = 0.3333333333333333 * 1.732050807568877
+
+
+@njit(cache=True)
+def _radial(ax, da, A, R):
+    """Contracted radial part and distance vector A - R."""
+    dx = A[0] - R[0]
+    dy = A[1] - R[1]
+    dz = A[2] - R[2]
+    r2 = dx * dx + dy * dy + dz * dz
+    radial = 0.0
+    for p in range(ax.size):
+        radial += da[p] * math.exp(-ax[p] * r2)
+    return dx, dy, dz, radial
+
+
+@njit(cache=True)
+def cart_gto3d_0(ax, da, A, R, out):
+    """3D Cartesian s-Gaussian shell, written into out."""
+    _, _, _, radial = _radial(ax, da, A, R)
+    out[0] = radial
+
+
+@njit(cache=True)
+def cart_gto3d_1(ax, da, A, R, out):
+    """3D Cartesian p-Gaussian shell, written into out."""
+    x, y, z, radial = _radial(ax, da, A, R)
+    out[0] = -x * radial
+    out[1] = -y * radial
+    out[2] = -z * radial
+
+
+@njit(cache=True)
+def cart_gto3d_2(ax, da, A, R, out):
+    """3D Cartesian d-Gaussian shell, written into out."""
+    x, y, z, radial = _radial(ax, da, A, R)
+    c2 = _C2 * radial
+    out[0] = x * x * c2
+    out[1] = x * y * radial
+    out[2] = x * z * radial
+    out[3] = y * y * c2
+    out[4] = y * z * radial
+    out[5] = z * z * c2
+
+
+@njit(cache=True)
+def cart_gto3d_3(ax, da, A, R, out):
+    """3D Cartesian f-Gaussian shell, written into out."""
+    x, y, z, radial = _radial(ax, da, A, R)
+    c2 = -_C2 * radial
+    c3 = -_C3 * radial
+    out[0] = x * x * x * c3
+    out[1] = x * x * y * c2
+    out[2] = x * x * z * c2
+    out[3] = x * y * y * c2
+    out[4] = -x * y * z * radial
+    out[5] = x * z * z * c2
+    out[6] = y * y * y * c3
+    out[7] = y * y * z * c2
+    out[8] = y * z * z * c2
+    out[9] = z * z * z * c3
+
+
+@njit(cache=True)
+def cart_gto3d_4(ax, da, A, R, out):
+    """3D Cartesian g-Gaussian shell, written into out."""
+    x, y, z, radial = _radial(ax, da, A, R)
+    c3 = _C3 * radial
+    c4 = _C4 * radial
+    c4_1 = _C4_1 * radial
+    c4_2 = _C4_2 * radial
+    out[0] = x * x * x * x * c4
+    out[1] = x * x * x * y * c3
+    out[2] = x * x * x * z * c3
+    out[3] = x * x * y * y * c4_1
+    out[4] = x * x * y * z * c4_2
+    out[5] = x * x * z * z * c4_1
+    out[6] = x * y * y * y * c3
+    out[7] = x * y * y * z * c4_2
+    out[8] = x * y * z * z * c4_2
+    out[9] = x * z * z * z * c3
+    out[10] = y * y * y * y * c4
+    out[11] = y * y * y * z * c3
+    out[12] = y * y * z * z * c4_1
+    out[13] = y * z * z * z * c3
+    out[14] = z * z * z * z * c4
+
+
+@njit(cache=True)
+def cart_gto3d_shell(L, ax, da, A, R, out):
+    """Dispatch to the kernel for angular momentum L."""
+    if L == 0:
+        cart_gto3d_0(ax, da, A, R, out)
+    elif L == 1:
+        cart_gto3d_1(ax, da, A, R, out)
+    elif L == 2:
+        cart_gto3d_2(ax, da, A, R, out)
+    elif L == 3:
+        cart_gto3d_3(ax, da, A, R, out)
+    elif L == 4:
+        cart_gto3d_4(ax, da, A, R, out)
+    else:
+        raise ValueError("Only shells up to L = 4 are supported!")
+
+
+@njit(cache=True, parallel=True)
+def cart_gto3d_basis(Ls, prim_ptrs, exps, coeffs, centers, offsets, xyz, out):
+    """Evaluate all shells of a basis at all points of an (N, 3) grid.
+
+    The primitives of shell i are exps[prim_ptrs[i]:prim_ptrs[i+1]] (and
+    the same for coeffs); its components are written to the columns of out
+    starting at offsets[i]. The points are distributed over the threads."""
+    nshells = Ls.size
+    for j in prange(xyz.shape[0]):
+        R = xyz[j]
+        for i in range(nshells):
+            L = Ls[i]
+            first = prim_ptrs[i]
+            last = prim_ptrs[i + 1]
+            offset = offsets[i]
+            size = (L + 1) * (L + 2) // 2
+            cart_gto3d_shell(
+                L,
+                exps[first:last],
+                coeffs[first:last],
+                centers[i],
+                R,
+                out[j, offset : offset + size],
+            )
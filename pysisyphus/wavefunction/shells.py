@@ -4,7 +4,7 @@
 #     Lehtola, Visscher, Engel,  2020
 
 import itertools as it
-from math import sqrt, log, pi
+from math import sqrt, log, pi, prod
 from pathlib import Path
 import textwrap
 from typing import List, Literal
@@ -35,7 +35,6 @@ from pysisyphus.wavefunction.helpers import (
 )
 
 from pysisyphus.wavefunction.ints import (
-    cart_gto3d,
     coulomb3d,
     diag_quadrupole3d,
     dipole3d,
@@ -46,10 +45,42 @@ from pysisyphus.wavefunction.ints import (
     int3c2e3d_sph,
 )
 
+from pysisyphus.wavefunction import jit
 from pysisyphus.wavefunction.cart2sph import cart2sph_coeffs
+from pysisyphus.wavefunction.jit import HAS_NUMBA
 from pysisyphus.wavefunction.normalization import norm_cgto_lmn
 
 
+def _cart_lmns_factors(L):
+    lmns = np.array(canonical_order(L))
+    # Product of the double factorials (2l-1)!! (2m-1)!! (2n-1)!!
+    dfacts = [prod(range(2 * am - 1, 0, -2)) for am in lmns.flatten()]
+    factors = 1 / np.sqrt(np.prod(np.reshape(dfacts, lmns.shape), axis=1))
+    return lmns, factors
+
+
+# Cartesian exponents and normalization factors of all components of a shell
+CART_LMNS_FACTORS = {L: _cart_lmns_factors(L) for L in range(L_MAX + 1)}
+
+
+def eval_cart_shell(La, ax, da, A, R):
+    """Evaluate all Cartesian components of a shell at R.
+
+    Yields the same values as the generated cart_gto3d functions, but the
+    contraction over the primitives is only carried out once and is then
+    shared by all components. R may be a single point or an (N, 3) array of
+    points, in which case an (N, ncomponents) array is returned."""
+    lmns, factors = CART_LMNS_FACTORS[La]
+    RA = R - A
+    radial = np.exp(-np.sum(RA * RA, axis=-1)[..., None] * ax) @ da
+    # Powers 0, ..., La of the x, y and z components are calculated only once
+    # and shared by all components.
+    pows = RA[..., None, :] ** np.arange(La + 1)[:, None]
+    l, m, n = lmns.T
+    angular = pows[..., l, 0] * pows[..., m, 1] * pows[..., n, 2]
+    return factors * angular * radial[..., None]
+
+
 class Shell:
     def __init__(
         self,
@@ -565,20 +596,31 @@ class Shells:
         else:
             precontr = self.P_cart.T
         ncbfs = precontr.shape[0]
+        xyz = np.asarray(xyz, dtype=float).reshape(-1, 3)
         npoints = len(xyz)
 
-        coords3d = self.coords3d
         grid_vals = np.zeros((npoints, ncbfs))
-        for center_ind, shells in self.center_shell_iter():
-            # Create list from the shells iterator, otherwise it will be empty
-            # after the first pass over all points.
-            shells = list(shells)
-            for i, R in enumerate(xyz):
-                for shell in shells:
-                    La, A, da, ax, a_ind, a_size = shell.as_tuple()
-                    grid_vals[i, a_ind : a_ind + a_size] = cart_gto3d.cart_gto3d[(La,)](
-                        ax, da, A, R
-                    )
+        Ls, centers, coeffs, exps, inds, _ = self.as_tuple()
+        # The whole basis is evaluated in one call of the compiled kernel
+        if HAS_NUMBA:
+            prim_ptrs = np.cumsum([0] + [len(exps_) for exps_ in exps])
+            jit.cart_gto3d_basis(
+                np.array(Ls),
+                prim_ptrs,
+                np.concatenate(exps),
+                np.concatenate(coeffs),
+                np.array(centers, dtype=float),
+                np.array(inds),
+                xyz,
+                grid_vals,
+            )
+        # Every shell is evaluated at all points at once
+        else:
+            for shell in self.shells:
+                La, A, da, ax, a_ind, a_size = shell.as_tuple()
+                grid_vals[:, a_ind : a_ind + a_size] = eval_cart_shell(
+                    La, ax, da, A, xyz
+                )
         return grid_vals @ precontr
 
     def get_1el_ints_cart(
@@ -1,9 +1,14 @@
 from pysisyphus.constants import AU2KJPERMOL, AU2KCALPERMOL, AU2EV, ANG2BOHR, BOHR2M
 
 import numpy as np
-import yaml
 from yaml.constructor import ConstructorError
 
+try:
+    # Parser and scanner implemented in C by libyaml; yields the same results
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
 _UNIT_MAP = {
     # Energies are converted to Hartree (E_h)
     "Eh": 1,
@@ -38,7 +43,7 @@ def get_constructor(unit):
 
 
 def get_loader(units=_UNITS):
-    loader = yaml.SafeLoader
+    loader = _SafeLoader
     for unit in units:
         tag = f"!{unit}"
         loader.add_constructor(tag, get_constructor(unit))
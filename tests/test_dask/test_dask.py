@@ -1,5 +1,7 @@
 from distributed import LocalCluster
+import numpy as np
 
+from pysisyphus.calculators.AnaPot import AnaPot
 from pysisyphus.cos.NEB import NEB
 from pysisyphus.helpers import geom_loader
 
@@ -26,3 +28,25 @@ def test_dask():
         opt.run()
 
     assert opt.cur_cycle == (max_cycles - 1)
+
+
+def test_dask_batch_size():
+    pal = 4
+    all_energies = list()
+    all_forces = list()
+    with LocalCluster(n_workers=2, threads_per_worker=1, processes=False) as cluster:
+        address = cluster.scheduler_address
+        for batch_size in (1, 3):
+            geoms = AnaPot().get_path(7)
+            for geom in geoms:
+                calc = AnaPot()
+                calc.pal = pal
+                geom.set_calculator(calc)
+            neb = NEB(geoms, scheduler=address, batch_size=batch_size)
+            all_forces.append(neb.forces)
+            all_energies.append(neb.energy)
+            # pal is restored after the calculations
+            assert all([image.calculator.pal == pal for image in neb.images])
+
+    np.testing.assert_allclose(all_energies[1], all_energies[0])
+    np.testing.assert_allclose(all_forces[1], all_forces[0])
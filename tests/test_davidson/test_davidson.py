@@ -3,9 +3,11 @@ import pytest
 
 from pysisyphus.calculators import XTB
 from pysisyphus.calculators.PySCF import PySCF
+from pysisyphus.Geometry import get_trans_rot_projector
 from pysisyphus.helpers import geom_loader
 from pysisyphus.helpers_pure import eigval_to_wavenumber
 from pysisyphus.modefollow import geom_davidson
+from pysisyphus.modefollow.davidson import block_davidson, shifted_pinv_dot
 from pysisyphus.modefollow.NormalMode import NormalMode
 from pysisyphus.tsoptimizers.RSPRFOptimizer import RSPRFOptimizer
 from pysisyphus.testing import using
@@ -79,3 +81,99 @@ def test_block_davidson_hcn():
 
     assert result.converged
     assert result.cur_cycle == 1
+
+
+@pytest.mark.parametrize("rank", (3, 8))
+def test_shifted_pinv_dot(rank):
+    rng = np.random.default_rng(20180325)
+    eigvecs, _ = np.linalg.qr(rng.random((8, rank)))
+    eigvals = rng.random(rank)
+    mat = eigvecs @ np.diag(eigvals) @ eigvecs.T
+    vec = rng.random(8)
+    # Shift by an eigenvalue, so the shifted matrix is singular
+    shift = eigvals[0]
+    ref = np.linalg.pinv(mat - shift * np.eye(8), rcond=1e-8) @ vec
+    np.testing.assert_allclose(shifted_pinv_dot(eigvals, eigvecs, shift, vec), ref)
+
+    # Multiple shifts and vectors at once
+    shifts = np.array((shift, 0.5, 0.0))
+    vecs = rng.random((8, shifts.size))
+    batched = shifted_pinv_dot(eigvals, eigvecs, shifts, vecs)
+    for shift_, vec_, res in zip(shifts, vecs.T, batched.T):
+        ref = shifted_pinv_dot(eigvals, eigvecs, shift_, vec_)
+        np.testing.assert_allclose(res, ref)
+
+
+def test_block_davidson_diag_precon():
+    geom = geom_loader("lib:codein.xyz")
+    coords = geom.cart_coords
+    rng = np.random.default_rng(20180325)
+    # Model Hessian without translation and rotation
+    P = get_trans_rot_projector(coords, geom.masses, full=True)
+    tmp = rng.random((coords.size, coords.size)) - 0.5
+    tmp = 0.01 * (tmp + tmp.T) + np.diag(np.linspace(-0.1, 1.0, coords.size))
+    hessian_mw = P @ tmp @ P
+    msqrt = np.sqrt(geom.masses_rep)
+    hessian = hessian_mw * msqrt[:, None] * msqrt[None, :]
+
+    def forces_getter(cart_coords):
+        return -hessian @ (cart_coords - coords)
+
+    # Perturbed lowest mode as guess
+    _, eigvecs = np.linalg.eigh(hessian_mw)
+    guess = (eigvecs[:, 0] + 0.1 * (rng.random(coords.size) - 0.5)) / msqrt
+
+    def run(**kwargs):
+        guess_modes = [NormalMode(guess, geom.masses_rep)]
+        return block_davidson(
+            coords, geom.masses, forces_getter, guess_modes, print_level=0, **kwargs
+        )
+
+    precon_diag = np.diag(hessian_mw)
+    # The diagonal mode must agree with a full preconditioner that only holds
+    # the diagonal.
+    diag_result = run(hessian_precon=hessian_mw, precon_mode="diag")
+    full_result = run(hessian_precon=np.diag(precon_diag))
+    assert diag_result.converged
+    assert diag_result.cur_cycle == full_result.cur_cycle
+    np.testing.assert_allclose(diag_result.nus, full_result.nus)
+
+
+@pytest.mark.parametrize("lowest", (1, 2, 3))
+def test_block_davidson_lowest(lowest):
+    geom = geom_loader("lib:codein.xyz")
+    coords = geom.cart_coords
+    rng = np.random.default_rng(20180325)
+    P = get_trans_rot_projector(coords, geom.masses, full=True)
+    tmp = rng.random((coords.size, coords.size)) - 0.5
+    tmp = 0.01 * (tmp + tmp.T) + np.diag(np.linspace(-0.1, 1.0, coords.size))
+    hessian_mw = P @ tmp @ P
+    msqrt = np.sqrt(geom.masses_rep)
+    hessian = hessian_mw * msqrt[:, None] * msqrt[None, :]
+
+    def forces_getter(cart_coords):
+        return -hessian @ (cart_coords - coords)
+
+    # Perturbed three lowest modes as guesses, independent of the number of
+    # requested roots.
+    w, eigvecs = np.linalg.eigh(hessian_mw)
+    guess_modes = [
+        NormalMode(
+            (eigvecs[:, i] + 0.1 * (rng.random(coords.size) - 0.5)) / msqrt,
+            geom.masses_rep,
+        )
+        for i in range(3)
+    ]
+    result = block_davidson(
+        coords,
+        geom.masses,
+        forces_getter,
+        guess_modes,
+        lowest=lowest,
+        hessian_precon=hessian_mw,
+        precon_mode="diag",
+        print_level=0,
+    )
+    assert result.converged
+    ref_nus = eigval_to_wavenumber(w[:lowest])
+    np.testing.assert_allclose(result.nus[result.mode_inds], ref_nus, rtol=1e-4)
@@ -1,6 +1,10 @@
+import numpy as np
 import pytest
 
 from pysisyphus.calculators import Gaussian16
+from pysisyphus.calculators.Gaussian16 import get_block_inds
+from pysisyphus.config import WF_LIB_DIR
+from pysisyphus.helpers import geom_loader
 from pysisyphus.testing import using
 
 
@@ -16,3 +20,100 @@ def test_all_energies():
     all_energies = geom.all_energies
     len(all_energies) == 3
     assert all_energies[2] == pytest.approx(-75.5569539)
+
+
+def test_parse_fchk():
+    fchk = WF_LIB_DIR / "g16_ch4_qzvpp.fchk"
+    keys = ("Cartesian Gradient", "SCF Energy", "Alpha MO coefficients")
+    fchk_dict = Gaussian16.parse_fchk(fchk, keys)
+    assert fchk_dict["SCF Energy"] == pytest.approx(-40.21645585147624)
+    assert fchk_dict["Cartesian Gradient"].shape == (15,)
+    assert fchk_dict["Alpha MO coefficients"].shape == (177**2,)
+
+
+def test_parse_double_mol(this_dir):
+    calc = Gaussian16("hf sto-3g")
+    double_mol_ovlp = calc.parse_double_mol(this_dir / "double_mol_lif")
+    assert double_mol_ovlp.shape == (10, 10)
+    assert double_mol_ovlp[0, 0] == pytest.approx(1.0)
+    assert double_mol_ovlp[1, 0] == pytest.approx(0.241137)
+    assert double_mol_ovlp.sum() == pytest.approx(12.547608782)
+
+
+@pytest.mark.parametrize("nbas", (1, 4, 5, 12))
+def test_get_block_inds(nbas):
+    cols = 5
+    ref_rows = list()
+    ref_cols = list()
+    for start in range(0, nbas, cols):
+        for row in range(start, nbas):
+            for col in range(start, min(start + cols, row + 1)):
+                ref_rows.append(row)
+                ref_cols.append(col)
+    rows, cols_ = get_block_inds(nbas, cols=cols)
+    np.testing.assert_array_equal(rows, ref_rows)
+    np.testing.assert_array_equal(cols_, ref_cols)
+
+
+def test_prepare_input_updated_attributes(tmp_path):
+    geom = geom_loader("lib:h2o.xyz")
+    calc = Gaussian16("hf sto-3g", out_dir=tmp_path)
+    calc.charge = 1
+    calc.mult = 2
+    calc.pal = 4
+    inp = calc.prepare_input(geom.atoms, geom.cart_coords, "force")
+    assert "%nproc=4" in inp
+    assert f"%mem={4 * calc.mem}MB" in inp
+    assert "\n1 2\n" in inp
+
+
+def test_reuse_data_moves_guess_chk(tmp_path):
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    calc_path = tmp_path / "calc"
+    calc_path.mkdir()
+    calc = Gaussian16("hf sto-3g", out_dir=out_dir)
+    calc.fchk = out_dir / "prev.fchk"
+    calc.fchk.write_text("fchk")
+    calc.guess_chk.write_text("chk")
+    calc._guess_key = (str(calc.fchk), calc.fchk.stat().st_mtime_ns)
+
+    assert calc.reuse_data(calc_path) == "guess=read"
+    assert (calc_path / calc.chk_fn).read_text() == "chk"
+    # The guess is consumed, so no copy is left behind
+    assert not calc.guess_chk.exists()
+
+
+def test_keep_moves_chk_to_guess(tmp_path):
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    calc_path = tmp_path / "calc"
+    calc_path.mkdir()
+    calc = Gaussian16("hf sto-3g", out_dir=out_dir)
+    for ext in ("com", "log", "fchk", "chk"):
+        (calc_path / f"{calc.fn_base}.{ext}").write_text(ext)
+
+    kept_fns = calc.keep(calc_path)
+    assert kept_fns["fchk"] == calc.fchk
+    assert calc.guess_chk.read_text() == "chk"
+    assert not (calc_path / calc.chk_fn).exists()
+
+
+def test_run_after_waits_for_formchk(tmp_path):
+    calc = Gaussian16("hf sto-3g", out_dir=tmp_path)
+    (tmp_path / calc.chk_fn).write_text("chk")
+    # Stand-in for formchk, that always succeeds
+    calc.formchk_cmd = "true"
+    calc.track = True
+
+    def run_rwfdump(*args):
+        raise RuntimeError("rwfdump failed")
+
+    calc.run_rwfdump = run_rwfdump
+    returncodes = list()
+    wait_fchk = calc.wait_fchk
+    calc.wait_fchk = lambda proc: returncodes.append(wait_fchk(proc))
+
+    with pytest.raises(RuntimeError):
+        calc.run_after(tmp_path)
+    assert returncodes == [0]
@@ -1,9 +1,17 @@
 import numpy as np
+import pytest
 
+from pysisyphus.config import BEND_MIN_DEG, DIHED_MAX_DEG
 from pysisyphus.constants import ANG2BOHR
 from pysisyphus.Geometry import Geometry
+from pysisyphus.helpers import geom_loader
 from pysisyphus.intcoords import RedundantCoords
-from pysisyphus.intcoords.setup import setup_redundant
+from pysisyphus.intcoords.setup import (
+    get_bend_inds,
+    get_bond_sets,
+    get_dihedral_inds,
+    setup_redundant,
+)
 from pysisyphus.helpers_pure import get_cubic_crystal
 
 
@@ -62,3 +70,43 @@ def test_cubic_crystal():
     coord_info = setup_redundant(atoms, coords3d)
     assert len(coord_info.bonds) == 0
     assert len(coord_info.interfrag_bonds) == 54
+
+
+@pytest.mark.parametrize(
+    "fn, ref_bends, ref_dihedrals",
+    (
+        ("lib:h2o2_hf_321g_opt.xyz", [(0, 2, 3), (1, 3, 2)], [(1, 3, 2, 0)]),
+        (
+            "lib:acetaldehyd.xyz",
+            [
+                (1, 0, 6),
+                (2, 0, 6),
+                (0, 2, 3),
+                (3, 2, 5),
+                (3, 2, 4),
+                (1, 0, 2),
+                (0, 2, 5),
+                (0, 2, 4),
+                (4, 2, 5),
+            ],
+            [
+                (1, 0, 2, 3),
+                (1, 0, 2, 5),
+                (1, 0, 2, 4),
+                (6, 0, 2, 3),
+                (6, 0, 2, 5),
+                (6, 0, 2, 4),
+            ],
+        ),
+    ),
+)
+def test_bend_dihedral_order(fn, ref_bends, ref_dihedrals):
+    """Order and orientation of the primitives must stay stable, as they are
+    referenced by indices in restart files and constraints."""
+    geom = geom_loader(fn)
+    coords3d = geom.coords3d
+    bonds = [tuple(bond) for bond in get_bond_sets(geom.atoms, coords3d)]
+    bends = get_bend_inds(coords3d, bonds, BEND_MIN_DEG, 180)
+    assert bends == ref_bends
+    proper_dihedrals, _ = get_dihedral_inds(coords3d, bonds, bends, DIHED_MAX_DEG)
+    assert proper_dihedrals == ref_dihedrals
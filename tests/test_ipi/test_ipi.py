@@ -3,12 +3,14 @@ import subprocess
 import tempfile
 import threading
 import time
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 import pytest
 
 from pysisyphus.calculators import XTB
-from pysisyphus.calculators.IPIClient import calc_ipi_client
+from pysisyphus.calculators.IPIClient import calc_ipi_client, parallel_num_hessian
+from pysisyphus.calculators.LennardJones import LennardJones
 from pysisyphus.helpers import geom_loader
 from pysisyphus.testing import using
 
@@ -68,3 +70,15 @@ def test_ipi_server_client_opt():
             )
         )
         np.testing.assert_allclose(geom.coords, ref_coords)
+
+
+def test_parallel_num_hessian():
+    atoms = ("Ar", "Ar", "Ar")
+    coords = np.array((0.0, 0.0, 0.0, 2.3, 0.0, 0.0, 1.1, 2.0, 0.2))
+    calc = LennardJones()
+    ref_results = calc.get_hessian(atoms, coords)
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        hessian, energy = parallel_num_hessian(calc, atoms, coords, executor)
+    assert energy == pytest.approx(ref_results["energy"])
+    np.testing.assert_allclose(hessian, ref_results["hessian"], atol=1e-8)
@@ -81,6 +81,39 @@ def test_run_results():
     assert results.calc_getter
 
 
+@using("pyscf")
+@pytest.mark.parametrize("overlap_dumps", (True, False))
+def test_run_calculations_overlap_dumps(overlap_dumps):
+    run_dict = {
+        "geom": {
+            "type": "cart",
+            "fn": ["lib:h2o.xyz", "lib:h2o.xyz"],
+        },
+        "calc": {"type": "pyscf", "basis": "sto3g", "overlap_dumps": overlap_dumps},
+    }
+    results = run_from_dict(run_dict)
+
+    energies = [geom.energy for geom in results.calced_geoms]
+    assert len(energies) == 2
+    assert energies[0] == pytest.approx(energies[1])
+
+
+@using("pyscf")
+def test_run_calculations_release_calcs():
+    run_dict = {
+        "geom": {
+            "type": "cart",
+            "fn": ["lib:h2o.xyz", "lib:h2o.xyz"],
+        },
+        "calc": {"type": "pyscf", "basis": "sto3g", "release_calcs": True},
+    }
+    results = run_from_dict(run_dict)
+
+    calced_geoms = results.calced_geoms
+    assert all([geom.calculator is None for geom in calced_geoms])
+    assert calced_geoms[0].energy == pytest.approx(calced_geoms[1].energy)
+
+
 @using("pyscf")
 def test_run_dimer_irc():
     """Quick test to see if the Dimer method works well with
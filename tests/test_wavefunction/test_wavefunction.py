@@ -7,6 +7,9 @@ import pytest
 from pysisyphus.calculators.ORCA import parse_orca_cis
 from pysisyphus.config import WF_LIB_DIR
 from pysisyphus.wavefunction import Wavefunction
+from pysisyphus.wavefunction.ints import cart_gto3d
+from pysisyphus.wavefunction.jit import HAS_NUMBA
+from pysisyphus.wavefunction.shells import eval_cart_shell
 from pysisyphus.wavefunction.pop_analysis import (
     mulliken_charges,
     mulliken_charges_from_wf,
@@ -202,3 +205,37 @@ def test_eval_esp():
     # From orca_vpot
     esp_ref = (0.7086898598813272, 0.0984935998538505, -0.0830229403844891)
     np.testing.assert_allclose(esp, esp_ref, atol=1e-10)
+
+
+def test_shells_eval_jit(monkeypatch):
+    if not HAS_NUMBA:
+        pytest.skip("numba is not available")
+
+    # QZVPP basis of carbon contains g-functions
+    wf = Wavefunction.from_orca_json(WF_LIB_DIR / "orca_ch4_qzvpp.json")
+    shells = wf.shells
+    rng = np.random.default_rng(20230515)
+    xyz = 4 * rng.random((25, 3)) - 2
+
+    vals = shells.eval(xyz)
+    monkeypatch.setattr("pysisyphus.wavefunction.shells.HAS_NUMBA", False)
+    ref_vals = shells.eval(xyz)
+    np.testing.assert_allclose(vals, ref_vals, rtol=1e-12, atol=1e-14)
+
+
+@pytest.mark.parametrize("L", range(5))
+def test_eval_cart_shell(L):
+    rng = np.random.default_rng(20230515)
+    ax = rng.random(5) + 0.1
+    da = rng.random(5) - 0.3
+    A = rng.random(3)
+    R = 2 * rng.random(3)
+    vals = eval_cart_shell(L, ax, da, A, R)
+    ref_vals = cart_gto3d.cart_gto3d[(L,)](ax, da, A, R)
+    np.testing.assert_allclose(vals, ref_vals, rtol=1e-12, atol=1e-15)
+
+    # Multiple points at once
+    grid_vals = eval_cart_shell(L, ax, da, A, np.stack((R, A, -R)))
+    np.testing.assert_allclose(grid_vals[0], ref_vals, rtol=1e-12, atol=1e-15)
+    ref_vals = cart_gto3d.cart_gto3d[(L,)](ax, da, A, -R)
+    np.testing.assert_allclose(grid_vals[2], ref_vals, rtol=1e-12, atol=1e-15)
@@ -50,6 +50,7 @@ from pysisyphus.intcoords.derivatives import (
 )
 import pysisyphus.intcoords.mp_derivatives as mp_d
 from pysisyphus.intcoords.findiffs import fin_diff_prim, fin_diff_B
+from pysisyphus.intcoords.jit import HAS_NUMBA
 from pysisyphus.io.zmat import geom_from_zmat, zmat_from_str
 
 
@@ -489,3 +490,28 @@ def test_distance_function():
     ref_grad3d[indices[:3]] = ref_grad3d_[:3]
 
     np.testing.assert_allclose(grad3d, ref_grad3d, atol=1e-8)
+
+
+@pytest.mark.parametrize("use_numba", (True, False))
+@pytest.mark.parametrize("prim_cls, ind_num", ((Stretch, 2), (Bend, 3), (Torsion, 4)))
+def test_calculate_batch(prim_cls, ind_num, use_numba, monkeypatch):
+    if use_numba and not HAS_NUMBA:
+        pytest.skip("numba is not available")
+    if not use_numba:
+        monkeypatch.setattr(
+            f"pysisyphus.intcoords.{prim_cls.__name__}.HAS_NUMBA", False, raising=False
+        )
+
+    rng = np.random.default_rng(20221123)
+    coords3d = 3 * rng.random((8, 3))
+    # Collinear atoms, so the cross vector fallbacks in Bend are exercised.
+    coords3d[6] = 2 * coords3d[1] - coords3d[0]
+    indices = np.array([rng.choice(6, ind_num, replace=False) for _ in range(25)])
+    if prim_cls is Bend:
+        indices = np.concatenate((indices, ((0, 1, 6), (6, 1, 0))))
+
+    vals, rows = prim_cls._calculate_batch(coords3d, indices, gradient=True)
+    for inds, val, row in zip(indices, vals, rows):
+        ref_val, ref_row = prim_cls._calculate(coords3d, inds, gradient=True)
+        assert val == pytest.approx(ref_val, abs=1e-7)
+        np.testing.assert_allclose(row, ref_row, atol=1e-10)